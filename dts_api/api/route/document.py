@@ -1,9 +1,12 @@
+from typing import Iterator
+
 from fastapi import APIRouter, Response, HTTPException
-from lxml import etree
-from starlette.responses import HTMLResponse, JSONResponse
+from starlette.responses import HTMLResponse, JSONResponse, StreamingResponse
 
 from dts_api.deps.selectors import service_selector
+from dts_api.funcs.xml_tools import chunked
 from dts_api.model.ParameterModel import document_params
+from dts_api.settings.settings import settings
 
 router = APIRouter()
 
@@ -12,8 +15,12 @@ def get(query: document_params, service: service_selector):
     doc = service.get(query)
     if doc is None:
         raise HTTPException(status_code=404, detail="Document not found.")
-    if query.media_type == 'text/xml':
-        return Response(content=etree.tostring(doc, encoding='UTF-8', pretty_print=True, xml_declaration=True), media_type="application/xml")
+    if query.media_type == 'text/xml' and isinstance(doc, Iterator):
+        # whole documents are serialized incrementally
+        return StreamingResponse(chunked(doc, settings.stream_chunk_size), media_type="application/xml")
+    if query.media_type == 'text/xml' and isinstance(doc, bytes):
+        # fragments are serialized by the designer
+        return Response(content=doc, media_type="application/xml")
     if query.media_type == 'text/html':
         return HTMLResponse(str(doc))
     if query.media_type == 'application/json':
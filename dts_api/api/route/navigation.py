@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 
 from dts_api.deps.selectors import service_selector
 from dts_api.model.NavigationModel import NavigationModel
@@ -10,7 +10,8 @@ router = APIRouter()
 @router.get("/", response_model=NavigationModel, description="Navigation get endpoint")
 def get(params: navigation_params, service: service_selector):
     representation: NavigationModel = service.get(params)
-    return JSONResponse(content=representation.model_dump(by_alias=True, exclude_none=True, exclude_defaults=False), media_type="Content-Type: application/json")
+    # serialized to JSON by pydantic-core, without an intermediate dict
+    return Response(content=representation.model_dump_json(by_alias=True, exclude_none=True, exclude_defaults=False), media_type="Content-Type: application/json")
 
 @router.post("/", description="Navigation post endpoint")
 def post():
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from starlette.requests import Request
 
 from dts_api.classes.Cache import Cache
+from dts_api.classes.Store import Store
 from dts_api.model.RootModel import RootModel
 from dts_api.settings.settings import Settings, get_settings
 
@@ -23,4 +24,17 @@ def get_root(request: Request, settings: Settings = Depends(get_settings)):
 def reset_cache():
     cache = Cache()
     cache.clear()
-    return {"value": "Cache reset successfully"}
\ No newline at end of file
+    # the CitationTrees descriptors kept in the index entries are read again from the headers
+    for entry in Store().index:
+        entry.deployed_citation_trees = None
+    return {"value": "Cache reset successfully"}
+
+@router.get('/reload_index', description="Reload the metadata file endpoint", include_in_schema=False)
+def reload_index():
+    changed = Store().reload()
+    return {"value": "Index reloaded successfully", "changed": changed}
+
+@router.get('/cache_stats', description="Cache statistics endpoint", include_in_schema=False)
+def cache_stats():
+    cache = Cache()
+    return cache.stats()
\ No newline at end of file
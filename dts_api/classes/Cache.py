@@ -1,4 +1,127 @@
+import sys
+import time
+from collections import OrderedDict
 from threading import Lock
+from typing import Any, Callable
+
+from lxml import etree
+
+from dts_api.classes.TocIndex import TocIndex
+from dts_api.settings.settings import settings
+
+
+def estimate_size(value: Any) -> int:
+    """
+    rough memory weight of a cached value, in bytes
+
+    lxml trees are weighted by their serialized size, python containers by the sum of their items
+    """
+    if isinstance(value, TocIndex):
+        return estimate_size(value.toc)
+    if isinstance(value, (etree._ElementTree, etree._Element)):
+        return len(etree.tostring(value))
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class CacheNamespace:
+    """
+    LRU cache bounded by the memory weight of its entries, with an optional time to live
+    (for the whole namespace or per entry).
+
+    Entries can carry a version (e.g. a file mtime): a lookup with another version is a miss
+    and drops the stale entry.
+    """
+
+    def __init__(self, name: str, max_bytes: int, ttl: float | None = None, weigher: Callable[[Any], int] = estimate_size):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.weigher = weigher
+        self.entries: OrderedDict = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock: Lock = Lock()
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, entry_version, expires = entry
+            if expires is not None and time.monotonic() > expires:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if version is not None and entry_version != version:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, size: int = None, version=None, ttl: float | None = None):
+        if size is None:
+            size = self.weigher(value)
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (value, size, version, None if ttl is None else time.monotonic() + ttl)
+            self.size += size
+            # the last inserted entry is kept, even when it exceeds the budget on its own
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                evicted_key = next(iter(self.entries))
+                self._remove(evicted_key)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self.entries.keys())
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key):
+        _, size, _, _ = self.entries.pop(key)
+        self.size -= size
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
 
 
 class CacheMeta(type):
@@ -13,42 +136,74 @@ class CacheMeta(type):
                 cls._instances[cls] = super(CacheMeta, cls).__call__(*args, **kwargs)
         return cls._instances[cls]
 
-    def get(self, key):
+    def namespace(self, name):
         ...
-    def set(self, key, value):
+    def get(self, key, namespace):
         ...
-    def delete(self, key):
+    def set(self, key, value, namespace):
+        ...
+    def delete(self, key, namespace):
+        ...
+    def drop(self, resource_id, namespaces):
         ...
     def clear(self):
         ...
-    def cache_size(self):
+    def stats(self):
         ...
 
 class Cache(metaclass=CacheMeta):
+    """
+    Process wide cache, split into namespaces that each have their own memory budget:
+
+    - toc: tables of content, one per resource and citation tree
+    - document: parsed documents
+    - html: rendered HTML views
+    - wrapper: serialized TEI wrappers of the XML fragments, one per resource
+    - response: rendered responses of the DTS endpoints
+    """
 
     _instance = None
 
     def __init__(self):
         print("Cache initialized")
         if not hasattr(self, 'initialized'):
-            self.cache = {}
-            self.cache_size = 0
-            self.cache_limit = 1000
+            ttl = settings.cache_ttl
+            # number of resets, it stamps the ETags of the responses
+            self.generation: int = 0
+            self.namespaces: dict[str, CacheNamespace] = {
+                'toc': CacheNamespace('toc', settings.cache_toc_bytes, ttl),
+                'document': CacheNamespace('document', settings.cache_document_bytes, ttl),
+                'html': CacheNamespace('html', settings.cache_html_bytes, ttl),
+                'wrapper': CacheNamespace('wrapper', settings.cache_wrapper_bytes, ttl),
+                'response': CacheNamespace('response', settings.cache_response_bytes, ttl),
+            }
 
-    def get(self, key):
-        return self.cache.get(key)
+    def namespace(self, name: str) -> CacheNamespace:
+        return self.namespaces[name]
 
-    def set(self, key, value):
-        if self.cache_size >= self.cache_limit:
-            self.clear()
-        self.cache[key] = value
-        self.cache_size += 1
+    def get(self, key, namespace: str = 'toc'):
+        return self.namespaces[namespace].get(key)
 
-    def delete(self, key):
-        if key in self.cache:
-            del self.cache[key]
-            self.cache_size -= 1
+    def set(self, key, value, namespace: str = 'toc'):
+        self.namespaces[namespace].set(key, value)
+
+    def delete(self, key, namespace: str = 'toc'):
+        self.namespaces[namespace].delete(key)
+
+    def drop(self, resource_id: str, namespaces: tuple = ('toc', 'html', 'wrapper')):
+        """
+        drop the cached entries of a resource from the namespaces keyed by its id
+        """
+        for name in namespaces:
+            namespace = self.namespaces[name]
+            for key in namespace.keys():
+                if key == resource_id or (isinstance(key, tuple) and key[0] == resource_id):
+                    namespace.delete(key)
 
     def clear(self):
-        self.cache.clear()
-        self.cache_size = 0
\ No newline at end of file
+        for namespace in self.namespaces.values():
+            namespace.clear()
+        self.generation += 1
+
+    def stats(self) -> dict:
+        return {name: namespace.stats() for name, namespace in self.namespaces.items()}
@@ -68,8 +68,7 @@ class NavigationContentExtractor(CommonExtractor):
 
         if args:
             _, = args
-        resource, ref, start, end, down, tree, page, limit, offset, dts_resource, cite_structure, document = kwargs.values()
-        toc = dts_resource.find("%sTableOfContent/CitationTree[@tree='%s']" % (self.namespace, tree))
+        resource, ref, start, end, down, tree, page, limit, offset, dts_resource, cite_structure, document, toc = kwargs.values()
 
         if ref and start is None and end is None and down is None:
             navigation_info = self.content_builder.get_navigation_info(toc=toc, ref=ref, nsmap=self.nsmap)
@@ -85,7 +84,7 @@ class NavigationContentExtractor(CommonExtractor):
         if ref and start is None and end is None and (down or down==0):
             try:
                 navigation_info = self.content_builder.get_navigation_info(toc, self.nsmap, ref=ref)
-                navigation = self.content_builder.get_content(ref, down, toc, self.nsmap)
+                navigation = self.content_builder.get_content(ref, down, toc)
             except ValueError as error:
                 raise error
 
@@ -96,6 +95,11 @@ class NavigationContentExtractor(CommonExtractor):
             except BadRangeError as error:
                 raise error
 
+        # compact rows of the selected units, members are only built for the requested page
+        if navigation is not None:
+            navigation = toc.rows_of(navigation)
+        navigation_info = [toc.row(unit.get('ref')) if unit is not None else None for unit in navigation_info]
+
         citation_trees, max_cite_depth = self.content_builder.get_citation_trees(cite_structure)
         return navigation, navigation_info, citation_trees, max_cite_depth
 
@@ -108,8 +112,7 @@ class DocumentContentExtractor(CommonExtractor):
     def extract_content(self, *args, **kwargs):
         if args:
             _, = args
-        resource, ref, start, end, tree, media_type, dts_resource, cite_structure, document = kwargs.values()
-        toc = dts_resource.find(".//%sTableOfContent/CitationTree[@tree='%s']" % (self.namespace, tree))
+        resource, ref, start, end, tree, media_type, stylesheet, dts_resource, cite_structure, document, toc = kwargs.values()
 
         content = []
 
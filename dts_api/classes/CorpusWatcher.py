@@ -0,0 +1,127 @@
+import os
+from pathlib import Path
+from threading import Event, Thread
+from typing import Callable
+
+from dts_api.classes.Cache import Cache, estimate_size
+from dts_api.classes.Pipeline import TocPipelineBuilder
+from dts_api.classes.Store import Store
+from dts_api.classes.TocIndex import TocIndex
+from dts_api.classes.Utils import nsmp
+from dts_api.model.MetadataModel import IndexMetadataModel
+
+
+class CorpusWatcher:
+    """
+    Background watcher of the metadata file and the TEI files of a local storage.
+
+    The metadata file and the indexed files under base_path are polled (mtime and size, as the document cache).
+    When a file changes, the cached TOCs of its resources are rebuilt from the new document and swapped in the
+    TOC cache, their HTML views and XML wrappers are dropped and their revision is bumped, so that their cached
+    responses are stale. A change of the metadata file reloads the index (see Store.reload).
+    The cached TOCs are stamped as the cached documents: requests never pair an old TOC with a new document,
+    the watcher only rebuilds the TOCs before they are requested.
+    The entries of the other resources stay in cache.
+    """
+
+    def __init__(self, store: Store, interval: float = 1.0, report: Callable = print):
+        self.store = store
+        self.interval = interval
+        self.report = report
+        self.cache: Cache = Cache()
+        self.builder = TocPipelineBuilder()
+        self.nsmap = nsmp()[2]
+        self.base_path = Path(store.fs.base_path)
+        self.metadata_path: str = store.fs.metadata_path
+        # location -> resource entries stored in the file
+        self.locations: dict[str, list[IndexMetadataModel]] = {}
+        self.stamps: dict[str, tuple | None] = {self.metadata_path: self.stamp(self.metadata_path)}
+        self.index_locations()
+        self._stop: Event = Event()
+        self._thread: Thread | None = None
+
+    def index_locations(self):
+        """
+        map the files of the current index to their resources, the new files are stamped as they are
+        """
+        locations: dict[str, list[IndexMetadataModel]] = {}
+        for entry in self.store.index:
+            if entry.type.lower() == 'resource' and entry.location:
+                resources = locations.setdefault(entry.location, [])
+                if entry.id not in [resource.id for resource in resources]:
+                    resources.append(entry)
+        self.locations = locations
+        self.stamps = {location: self.stamps.get(location) or self.stamp(location) for location in [self.metadata_path, *locations]}
+
+    def stamp(self, location: str) -> tuple | None:
+        try:
+            stat = os.stat(self.base_path / location)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def scan(self) -> list[str]:
+        """
+        :return: locations changed since the last scan, a deleted file is left alone until it comes back
+        """
+        changed = []
+        for location, previous in self.stamps.items():
+            current = self.stamp(location)
+            if current is not None and current != previous:
+                self.stamps[location] = current
+                changed.append(location)
+        return changed
+
+    def refresh(self, location: str):
+        if location == self.metadata_path:
+            try:
+                changed = self.store.reload()
+            except Exception as error:
+                self.report(f"watcher {location}: failed ({error!r})")
+                return
+            self.index_locations()
+            self.report(f"watcher {location}: {len(changed)} changed entries")
+            return
+        for item in self.locations[location]:
+            try:
+                self.refresh_resource(item)
+            except Exception as error:
+                # e.g. a file saved while it is edited, the next change is picked up again
+                self.report(f"watcher {item.id}: failed ({error!r})")
+                continue
+            self.report(f"watcher {item.id}: refreshed")
+
+    def refresh_resource(self, item: IndexMetadataModel):
+        toc_cache = self.cache.namespace('toc')
+        trees = [key[1] for key in toc_cache.keys() if key[0] == item.id]
+
+        # the storage parses the new version; stamped before the read, a TOC built from a newer version is only
+        # missed by the requests, it is never paired with another document
+        stamp = self.store.get_stamp(item)
+        document, cite_metadata, cite_structure = self.store.get_document(item)
+        for tree in trees:
+            toc: TocIndex = self.builder.build_toc(document, cite_metadata, cite_structure, tree, self.nsmap)
+            self.store.save_toc(item, tree, toc, stamp)
+            toc_cache.set((item.id, tree), toc, size=estimate_size(toc), version=stamp)
+
+        self.cache.drop(item.id, ('html', 'wrapper'))
+
+        entries = self.store.get_index_entry(item.id)
+        for entry in entries:
+            entry.deployed_citation_trees = None
+        # the collections listing the resource show its citation trees
+        self.store.bump_revision(item.id, *{entry.parent_id for entry in entries if entry.parent_id})
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            for location in self.scan():
+                self.refresh(location)
+
+    def start(self):
+        self._thread = Thread(target=self.run, name='corpus-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
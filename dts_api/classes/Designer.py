@@ -1,8 +1,12 @@
+from copy import deepcopy
 from typing import Protocol
 
 from lxml import etree
 from lxml.etree import ElementTree, Element, _Element, _ElementTree
+from dts_api.classes.Cache import Cache, CacheNamespace
+from dts_api.classes.XsltRegistry import XsltRegistry
 from dts_api.funcs.common import element_to_dict
+from dts_api.funcs.xml_tools import serialize_fragment, iter_serialize
 
 
 class Designer(Protocol):
@@ -18,18 +22,22 @@ class HtmlDesigner:
 
     @staticmethod
     def design_root(*args, **kwargs):
-        dts_resource, fragment, nsmap = args
+        fragment, dts_resource, nsmap = args
         if kwargs:
             _, = kwargs
 
-        with open("dts_api/transform/html/xml_to_html.xsl", "r") as xslt_file:
-
-            # parser = etree.XMLParser(remove_comments=True)
-            xslt: ElementTree = etree.parse(xslt_file)
-            transform = etree.XSLT(xslt)
-
-            html: ElementTree = transform(fragment)
-            return html
+        # compiled once per process, the rendered views are cached until the stylesheet or the source file changes
+        transform, stylesheet_version = XsltRegistry().get(dts_resource.stylesheet)
+        cache: CacheNamespace = Cache().namespace('html')
+        version = (stylesheet_version, dts_resource.version)
+        # the whole document is transformed whatever the selection: one view per resource and stylesheet
+        key = (dts_resource.resource, dts_resource.stylesheet)
+        html: str = cache.get(key, version=version)
+        if html is None:
+            # xsl:strip-space strips the input tree in place, the cached document is transformed on a copy
+            html = str(transform(deepcopy(dts_resource.document)))
+            cache.set(key, html, version=version)
+        return html
 
     @staticmethod
     def design_subsection(*args, **kwargs):
@@ -38,22 +46,39 @@ class HtmlDesigner:
 
 class XmlDesigner:
 
+    # levels of the document opened by the streaming serialization (e.g. text/body/div), deeper subtrees are serialized at once
+    stream_depth: int = 3
+
+    template_path: str = "dts_api/template/dts_tei_template.xml"
+    template: _ElementTree | None = None
+
     @staticmethod
     def design_root(*args, **kwargs):
 
         fragment, dts_resource, nsmap = args
         if kwargs:
             _, = kwargs
-        proc = dts_resource.find('proc', namespaces=nsmap)
-        resource: _Element = fragment.find('TEI', namespaces=nsmap)
-
-        root = etree.Element("TEI", nsmap=nsmap)
-        representation = etree.ElementTree(root)
-        for pi in proc:
-            root.addprevious(pi)
-        root.extend(resource)
+        return XmlDesigner.iter_root(fragment, dts_resource, nsmap)
 
-        return representation
+    @staticmethod
+    def iter_root(resource: _Element, dts_resource, nsmap):
+        """
+        serialize the document incrementally: the processing instructions, then a TEI root with the children of the document root
+
+        :return: generator of bytes
+        """
+        yield b"<?xml version='1.0' encoding='UTF-8'?>\n"
+        for pi in dts_resource.proc:
+            yield etree.tostring(pi, encoding='UTF-8') + b'\n'
+
+        root = etree.tostring(etree.Element("TEI", nsmap=nsmap), encoding='UTF-8')
+        if not len(resource):
+            yield root + b'\n'
+            return
+        yield root[:-2] + b'>'
+        for child in resource:
+            yield from iter_serialize(child, nsmap, XmlDesigner.stream_depth)
+        yield b'</TEI>\n'
 
     @staticmethod
     def design_subsection(*args, **kwargs):
@@ -62,31 +87,61 @@ class XmlDesigner:
         if kwargs:
             _, = kwargs
 
-        with open("dts_api/template/dts_tei_template.xml", "r") as file:
-
-            document: _ElementTree = etree.parse(file)
+        if len(fragment):
             namespace = list(nsmap.values()).pop()
-            proc = dts_resource.find('proc', namespaces=nsmap)
-            header = dts_resource.find('{%s}Document/TEI/teiHeader' % namespace, namespaces=nsmap)
-
-            if len(fragment):
-                # todo : add doc
-
-                base = "{%s}wrapper" % "https://w3id.org/dts/api#"
-                element: _Element = Element(base, nsmap={"dts": "https://w3id.org/dts/api#"})
-                for cite_unit in fragment:
-                    for xml_el in cite_unit.find("content").iterchildren():
-                        element.append(xml_el)
-
-                root_node: _Element = document.getroot()
-                for pi in proc:
-                    root_node.addprevious(pi)
-                document_header = document.find('{%s}teiHeader' % namespace, namespaces=nsmap)
-                root_node.replace(document_header, header)
-                body = document.find('.//body', namespaces={None: namespace})
-                body.append(element)
-                return document
-            return None
+            # the wrapper of the resource is serialized once, the source elements are serialized in its place
+            prefix, suffix = XmlDesigner.get_wrapper(dts_resource, nsmap)
+            content = b''.join(
+                serialize_fragment(xml_el, {None: namespace}) for source_elements in fragment for xml_el in source_elements
+            )
+            return b''.join([prefix, content, suffix])
+        return None
+
+    @staticmethod
+    def get_template() -> _ElementTree:
+        """
+        :return: the TEI template of the fragments, parsed once per process and used read-only
+        """
+        if XmlDesigner.template is None:
+            XmlDesigner.template = etree.parse(XmlDesigner.template_path)
+        return XmlDesigner.template
+
+    @staticmethod
+    def get_wrapper(dts_resource, nsmap) -> tuple[bytes, bytes]:
+        """
+        serialized TEI wrapper of a resource: the processing instructions and the header of the resource in the template,
+        split around the opening and closing tags of an empty dts:wrapper
+
+        the wrapper is cached until the source file of the resource changes, unversioned resources are not cached
+
+        :return: tuple (prefix, suffix)
+        """
+        cache: CacheNamespace = Cache().namespace('wrapper')
+        # the file stamp identifies the version of the resource, the entry does not keep the document alive
+        wrapper = cache.get(dts_resource.resource, version=dts_resource.version) if dts_resource.version else None
+        if wrapper is not None:
+            return wrapper
+
+        namespace = list(nsmap.values()).pop()
+        document: _ElementTree = deepcopy(XmlDesigner.get_template())
+        element: _Element = Element("{%s}wrapper" % "https://w3id.org/dts/api#", nsmap={"dts": "https://w3id.org/dts/api#"})
+        empty_wrapper = etree.tostring(element)
+
+        root_node: _Element = document.getroot()
+        for pi in dts_resource.proc:
+            root_node.addprevious(deepcopy(pi))
+        header = dts_resource.header
+        if header is not None:
+            document_header = document.find('{%s}teiHeader' % namespace, namespaces=nsmap)
+            root_node.replace(document_header, deepcopy(header))
+        body = document.find('.//body', namespaces={None: namespace})
+        body.append(element)
+
+        prefix, suffix = etree.tostring(document, encoding='UTF-8', pretty_print=True, xml_declaration=True).split(empty_wrapper)
+        wrapper = (prefix + empty_wrapper[:-2] + b'>', b'</dts:wrapper>' + suffix)
+        if dts_resource.version:
+            cache.set(dts_resource.resource, wrapper, size=len(wrapper[0]) + len(wrapper[1]), version=dts_resource.version)
+        return wrapper
 
 class JsonDesigner:
     """ A simple static designer for JSON data.(beta version)"""
@@ -96,8 +151,7 @@ class JsonDesigner:
         if kwargs:
             _, = kwargs
 
-        resource: _Element = fragment.find('TEI', namespaces=nsmap)
-        text: _Element = resource.find('.//text', namespaces=nsmap)
+        text: _Element = fragment.find('.//text', namespaces=nsmap)
 
         return element_to_dict(text)
 
@@ -110,4 +164,4 @@ class JsonDesigner:
         if not fragment:
             return None
 
-        return element_to_dict(fragment[0])
+        return element_to_dict(fragment[0][0])
@@ -1,29 +1,38 @@
-from copy import deepcopy
-
-from dts_api.funcs.common import set_dts_resource
+from lxml.etree import _Element, _ElementTree
 
 
 class DtsResource:
-
-    def __init__(self, namespace, nsmap):
-
-        self.dts_resource = set_dts_resource()
-        self.nsmap = nsmap
+    """
+    Per request view of a resource: the document, its citation trees and its TOC.
+
+    The view only references the cached objects, nothing is copied: consumers that modify a tree
+    (e.g. the designers) must work on copies of the elements they take from it.
+    """
+
+    def __init__(self, resource: str, document: _ElementTree, cite_structure: _Element, toc: _ElementTree, namespace: str,
+                 selection: tuple = (), stylesheet: str = 'default', version: tuple | None = None):
+        self.resource = resource
+        self.document = document
+        self.cite_structure = cite_structure
+        self.toc = toc
         self.namespace = namespace
-
-    def set_dts_resource(self, *args, **kwargs):
-
-        resource, namespace, nsmap, document, cite_structure, toc = args
-        if kwargs:
-            _, = kwargs
-
-        document_copy = deepcopy(document.getroot())
-
-        for pi in document.xpath('//processing-instruction()'):
-            self.dts_resource.find('%sproc' % namespace, namespaces=nsmap).append(deepcopy(pi))
-        self.dts_resource.find('%sDocument' % namespace, namespaces=nsmap).set('resource', resource)
-        self.dts_resource.find('%sDocument' % namespace, namespaces=nsmap).append(document_copy)
-        self.dts_resource.find('%sCitationTrees' % namespace, namespaces=nsmap).extend(deepcopy(cite_structure))
-        self.dts_resource.find('%sTableOfContent' % namespace).append(deepcopy(toc.getroot()))
-
-        return self.dts_resource
\ No newline at end of file
+        # requested part of the resource (ref, start, end, tree) and HTML stylesheet
+        self.selection = selection
+        self.stylesheet = stylesheet
+        # version of the source file (see Store.get_stamp), None when it is unknown
+        self.version = version
+
+    @property
+    def root(self) -> _Element:
+        return self.document.getroot()
+
+    @property
+    def proc(self) -> list:
+        """
+        :return: processing instructions of the document
+        """
+        return self.document.xpath('//processing-instruction()')
+
+    @property
+    def header(self) -> _Element | None:
+        return self.root.find('%steiHeader' % self.namespace)
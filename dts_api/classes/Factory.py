@@ -24,13 +24,12 @@ class CollectionFactory:
         self.builder: RepresentationBuilder = builder
 
     def build(self, params: CollectionParams, index: IndexMetadataModel, content: dict):
+        # the page is selected on the raw children, only its members are built and decorated
+        children = content.get('children')
+        if children or content.get('type', '').lower() == 'collection':
+            content = {**content, 'children': self.builder.paginate(children, params)}
         self.builder.load_content(index, content, params)
-        collection: Collection = self.builder.get_representation()
         self.builder.decorate(index)
-        if collection.items and collection.type == 'Resource':
-            self.builder.paginate(collection.items, params)
-        if collection.type == "Collection":
-            self.builder.paginate(collection.items, params)
         return self.builder.get_representation()
 
 class NavigationFactory:
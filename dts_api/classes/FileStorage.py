@@ -1,4 +1,4 @@
-import copy
+from io import BytesIO
 from pathlib import Path
 from urllib.parse import urljoin
 from typing import Protocol, Union
@@ -8,50 +8,119 @@ from urllib.error import HTTPError, URLError
 from lxml import etree
 from lxml.etree import ElementTree
 
+from dts_api.classes.Cache import Cache, CacheNamespace
 from dts_api.classes.Utils import nsmp
 from dts_api.model.MetadataModel import IndexMetadataModel
+from dts_api.settings.settings import settings
 
 
 class FileStorage(Protocol):
 
     def open_document(self, path: Union[str | None] = None) -> str:
         ...
+    def open_cite_structure(self, index: IndexMetadataModel) -> etree._Element:
+        ...
+    def stamp(self, index: IndexMetadataModel) -> tuple | None:
+        ...
     def save_document(self, path: str):
         ...
     def __str__(self):
         ...
 
+def parse_cite_structure(source) -> etree._Element:
+    """
+    streaming parse of a TEI file, stopped at the end of its teiHeader
+
+    :param source: path or file-like object
+    :return: the (last) refsDecl element of the header
+    """
+    prefix, namespace, nsmap = nsmp({'tei': "http://www.tei-c.org/ns/1.0"})
+    cite_structure = None
+    for _, element in etree.iterparse(source, events=('end',), tag=(f'{namespace}refsDecl', f'{namespace}teiHeader'), remove_comments=True):
+        if element.tag == f'{namespace}teiHeader':
+            break
+        cite_structure = element
+    if cite_structure is None:
+        raise ValueError(f"[Storage] refsDecl not found in the header of {source}")
+    return cite_structure
+
 class LocalFileStorage:
 
-    def __init__(self, base_path: str, metadata_path: str):
+    def __init__(self, base_path: str, metadata_path: str, cache: CacheNamespace = None):
         self.type = "local"
         self.base_path = base_path  # local document store base path
         self.metadata_path = metadata_path
         self.full_path = Path(self.base_path) / self.metadata_path
+        # parsed master trees, stamped with the file mtime and size
+        self.cache: CacheNamespace = Cache().namespace('document') if cache is None else cache
 
 
     def open_document(self, index: IndexMetadataModel = None) -> str | tuple:
+        """
+        :param index: index entry of the resource, the metadata file is returned when omitted
+        :return: metadata file content or a tuple (document, citation trees metadata, refsDecl element),
+                 the cached tree and refsDecl are shared by every request and must be used read-only
+        """
         if index:
             if index.type == "collection":
                 raise ValueError("This is a collection, not a document")
             resource_path = Path(self.base_path) / index.location
             try:
-                with open(resource_path, "r") as file:
-
-                    prefix, namespace, nsmap = nsmp({'tei': "http://www.tei-c.org/ns/1.0"})
-                    # todo : pass parser arg value from config
-                    parser = etree.XMLParser(remove_comments=True)
-                    tree: ElementTree = etree.parse(file, parser)
-                    cite_structure = tree.xpath(f'.//tei:refsDecl', namespaces=nsmap).pop()
-
-                    return copy.deepcopy(tree), index.citation_trees, copy.deepcopy(cite_structure)
+                stat = resource_path.stat()
             except FileNotFoundError:
                 raise FileNotFoundError("[Storage] File not found")
+
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            cached = self.cache.get(str(resource_path), version=stamp)
+            if cached is None:
+                cached = self.parse_document(resource_path)
+                self.cache.set(str(resource_path), cached, size=stat.st_size, version=stamp)
+            tree, cite_structure = cached
+            return tree, index.citation_trees, cite_structure
         else:
             md_path = self.full_path
             with open(md_path) as f:
                 return f.read()
 
+    @staticmethod
+    def parse_document(resource_path: Path) -> tuple[ElementTree, etree._Element]:
+        try:
+            with open(resource_path, "r") as file:
+
+                prefix, namespace, nsmap = nsmp({'tei': "http://www.tei-c.org/ns/1.0"})
+                # todo : pass parser arg value from config
+                parser = etree.XMLParser(remove_comments=True)
+                tree: ElementTree = etree.parse(file, parser)
+                cite_structure = tree.xpath(f'.//tei:refsDecl', namespaces=nsmap).pop()
+
+                return tree, cite_structure
+        except FileNotFoundError:
+            raise FileNotFoundError("[Storage] File not found")
+
+    def open_cite_structure(self, index: IndexMetadataModel) -> etree._Element:
+        """
+        :return: the refsDecl of a resource, from the parsed document when it is cached, read from the header otherwise
+        """
+        resource_path = Path(self.base_path) / index.location
+        try:
+            stat = resource_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError("[Storage] File not found")
+        cached = self.cache.get(str(resource_path), version=(stat.st_mtime_ns, stat.st_size))
+        if cached is not None:
+            return cached[1]
+        return parse_cite_structure(str(resource_path))
+
+    def stamp(self, index: IndexMetadataModel) -> tuple | None:
+        """
+        :return: version of the source file of a resource (mtime, size), None when the file is missing
+        """
+        try:
+            stat = (Path(self.base_path) / index.location).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def save_document(self, path: str):
         pass
 
@@ -60,29 +129,41 @@ class LocalFileStorage:
 
 class GithubFileStorage:
 
-    def __init__(self, base_path: str, metadata_path: str):
+    def __init__(self, base_path: str, metadata_path: str, cache: CacheNamespace = None, ttl: float | None = None):
         self.type = "local"
         self.base_path = base_path  # local document store base path
         self.metadata_path = metadata_path
+        # parsed downloads keyed by their URL, remote files are not versioned: they expire after the ttl
+        self.cache: CacheNamespace = Cache().namespace('document') if cache is None else cache
+        self.ttl: float = settings.remote_document_ttl if ttl is None else ttl
 
     def open_document(self, index: IndexMetadataModel = None) -> str | tuple:
+        """
+        :param index: index entry of the resource, the metadata file is returned when omitted
+        :return: metadata file content or a tuple (document, citation trees metadata, refsDecl element),
+                 the cached tree and refsDecl are shared by every request and must be used read-only
+        """
         if index:
             if index.type == "collection":
                 raise ValueError("This is a collection, not a document")
             resource_path = urljoin(self.base_path, index.location)
-            try:
-                file = urlopen(resource_path)
+            cached = self.cache.get(resource_path)
+            if cached is None:
+                try:
+                    with urlopen(resource_path) as file:
+                        data = file.read()
+                except FileNotFoundError:
+                    raise FileNotFoundError("[Storage] File not found")
+                except URLError:
+                    raise URLError(reason="[Storage] The Internet connexion has been lost.", filename=resource_path)
                 prefix, namespace, nsmap = nsmp({'tei': "http://www.tei-c.org/ns/1.0"})
                 # todo : pass parser arg value from config
                 parser = etree.XMLParser(remove_comments=True)
-                tree: ElementTree = etree.parse(file, parser)
-                cite_structure = tree.xpath(f'.//tei:refsDecl', namespaces=nsmap).pop()
-
-                return copy.deepcopy(tree), index.citation_trees, copy.deepcopy(cite_structure)
-            except FileNotFoundError:
-                raise FileNotFoundError("[Storage] File not found")
-            except URLError:
-                raise URLError(reason="[Storage] The Internet connexion has been lost.", filename=resource_path)
+                tree: ElementTree = etree.parse(BytesIO(data), parser)
+                cached = tree, tree.xpath(f'.//tei:refsDecl', namespaces=nsmap).pop()
+                self.cache.set(resource_path, cached, size=len(data), ttl=self.ttl)
+            tree, cite_structure = cached
+            return tree, index.citation_trees, cite_structure
         else:
             try:
                 md_path = self.metadata_path
@@ -93,6 +174,29 @@ class GithubFileStorage:
             except URLError:
                 raise URLError("[Storage] The Internet connexion has been lost.")
 
+    def open_cite_structure(self, index: IndexMetadataModel) -> etree._Element:
+        """
+        :return: the refsDecl of a resource, from the downloaded document when it is cached, from its header otherwise
+        """
+        resource_path = urljoin(self.base_path, index.location)
+        cached = self.cache.get(resource_path)
+        if cached is not None:
+            return cached[1]
+        cite_structure = self.cache.get((resource_path, 'refsDecl'))
+        if cite_structure is None:
+            try:
+                # the download stops once the header is read
+                with urlopen(resource_path) as file:
+                    cite_structure = parse_cite_structure(file)
+            except URLError:
+                raise URLError(reason="[Storage] The Internet connexion has been lost.", filename=resource_path)
+            self.cache.set((resource_path, 'refsDecl'), cite_structure, ttl=self.ttl)
+        return cite_structure
+
+    def stamp(self, index: IndexMetadataModel) -> tuple | None:
+        # remote files are not versioned, downloads are kept for REMOTE_DOCUMENT_TTL seconds
+        return None
+
     def save_document(self, path: str):
         pass
     def __str__(self):
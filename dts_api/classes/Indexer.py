@@ -2,6 +2,7 @@ from typing import Protocol
 
 from dts_api.classes.Adapter import Adapter
 from dts_api.classes.FileStorage import FileStorage
+from dts_api.model.MetadataModel import IndexMetadataModel
 
 
 class Indexer(Protocol):
@@ -9,7 +10,10 @@ class Indexer(Protocol):
     def __init__(self, index_algorithm):
         self.index_algorithm=index_algorithm
 
-    def run(self):
+    def run(self, md=None):
+        ...
+
+    def build_lookup(self, index):
         ...
 
 class DefaultIndexer:
@@ -18,5 +22,38 @@ class DefaultIndexer:
         self.__index_algorithm=index_algorithm
         self.adapter=adapter
 
-    def run(self):
-        return self.__index_algorithm(self.adapter.extract(self.fs.open_document())) # default behaviour opens metadata file
\ No newline at end of file
+    def run(self, md=None):
+        if md is None:
+            md = self.adapter.extract(self.fs.open_document()) # default behaviour opens metadata file
+        return self.__index_algorithm(md)
+
+    def build_lookup(self, index: list[IndexMetadataModel]) -> 'IndexLookup':
+        return IndexLookup(index)
+
+
+class IndexLookup:
+    """
+    Secondary index of the metadata index, by entry id.
+
+    An id can have several entries (a resource listed in several collections), entries keep the index order.
+    Parents and children counts are computed once for all the entries of an id.
+    """
+
+    def __init__(self, index: list[IndexMetadataModel]):
+        self.entries: dict[str, list[IndexMetadataModel]] = {}
+        self.parents_count: dict[str, int] = {}
+        self.children_count: dict[str, int] = {}
+        for entry in index:
+            self.entries.setdefault(entry.id, []).append(entry)
+            self.parents_count[entry.id] = self.parents_count.get(entry.id, 0) + (1 if entry.depth else 0)
+            self.children_count[entry.id] = self.children_count.get(entry.id, 0) + entry.children_count
+
+    def get(self, entry_id: str) -> list[IndexMetadataModel]:
+        # a new list each time, callers pop entries out of it
+        return list(self.entries.get(entry_id, ()))
+
+    def count_parents(self, entry_id: str) -> int:
+        return self.parents_count.get(entry_id, 0)
+
+    def count_children(self, entry_id: str) -> int:
+        return self.children_count.get(entry_id, 0)
@@ -1,8 +1,10 @@
+from copy import deepcopy
 from functools import reduce
 from typing import Protocol, Callable
 
+from dts_api.classes.TocEngine import TocEngine
 from dts_api.funcs.common import set_citation_trees, select_tree, prepare_path, prepare_md_path, tag_original_document, \
-    build_toc, complete_ref
+    build_toc, complete_ref, index_toc
 
 
 class PipelineBuilder(Protocol):
@@ -14,17 +16,32 @@ class PipelineBuilder(Protocol):
 class TocPipelineBuilder:
 
     def __init__(self):
-        self.toc_func_array = [set_citation_trees, select_tree, prepare_path, prepare_md_path, tag_original_document, build_toc, complete_ref]
+        self.toc_func_array = [set_citation_trees, select_tree, prepare_path, prepare_md_path, tag_original_document, build_toc, complete_ref, index_toc]
         self.toc_func_test = []
         self.toc_func_array.reverse()
+        self.engine = TocEngine()
         self.toc_func_test.reverse()
 
     def get_pipeline(self, pipeline: str = 'toc'):
         if pipeline == 'toc':
-            return self.run(self.toc_func_array)
+            # tag_original_document and complete_ref write into the document and the refsDecl: they work on copies
+            run = self.run(self.toc_func_array)
+            return lambda document, cite_metadata, cite_structure, tree, nsmap: \
+                run(deepcopy(document), cite_metadata, deepcopy(cite_structure), tree, nsmap)
         if pipeline == 'test':
             return self.run(self.toc_func_test)
 
+    def build_toc(self, document, cite_metadata, cite_structure, tree: str, nsmap: dict):
+        """
+        build the TOC of a citation tree in a single pass over the document
+
+        the document and the refsDecl are only read: units point into them by their fullpath,
+        the 'toc' pipeline gives the same TOC
+        """
+        tree_name, citation_trees, document, nsmap = set_citation_trees(document, cite_metadata, cite_structure, tree, nsmap)
+        selected_tree, document, tree_name = select_tree((tree_name, citation_trees, document, nsmap))
+        return self.engine.build(document, selected_tree, tree_name)
+
     @staticmethod
     def run(func_array: list[Callable]):
         return reduce(lambda g, h: lambda *args: g(h(*args)), func_array)
\ No newline at end of file
@@ -5,11 +5,12 @@ from dts_api.classes.Error import BadRangeError
 from dts_api.funcs.common import is_request_out_of_range, build_citation_trees
 from dts_api.model.NavigationModel import CitableUnit, NavigationModel, NavigationResource, CitationTree
 from dts_api.funcs.xml_tools import (pick_root, pick_ref, pick_ref_siblings, pick_ref_parent,
-                                     narrow_selection as narrower, term_extractor, populate_content)
+                                     narrow_selection as narrower, select_fragment)
 
 from lxml.etree import Element
 from starlette.requests import Request
 
+from dts_api.classes.DtsResource import DtsResource
 from dts_api.classes.Store import Store
 from dts_api.classes.Utils import get_url_components, set_path, nsmp
 from dts_api.model.CollectionModel import Collection, CollectionResource
@@ -44,6 +45,7 @@ class CollectionBuilder:
         self.model: Collection | CollectionResource | None = None
         self.paginator = paginator
         self.view = PartialCollectionView
+        self.partial_view: PartialCollectionView | None = None
         self.store = store
 
     def reset(self):
@@ -72,8 +74,15 @@ class CollectionBuilder:
                 self.model = self.collection_resource(**content, index=index, url_components=url_components)
             else:
                 self.model = self.collection_resource(**content, index=index, url_components=url_components)
+        if self.partial_view is not None:
+            self.model.view = self.partial_view
 
-    def paginate(self, *args, **kwargs):
+    def paginate(self, *args, **kwargs) -> list:
+        """
+        select the page of the raw children, the pagination view is set on the model once it is loaded
+
+        :return: children of the page
+        """
         members, params = args
         if kwargs:
             _, = kwargs
@@ -81,10 +90,8 @@ class CollectionBuilder:
         # preparing url components for pagination model
         url_components: UrlComponent = get_url_components(self.request, params)
         paginated_member_array, partial_view = self.paginator(url_components, self.view, members, PaginationParams(page=params.page, limit=params.limit, offset=params.offset))
-
-        # set paginated items and view
-        self.model.items = paginated_member_array
-        self.model.view = partial_view
+        self.partial_view = partial_view
+        return paginated_member_array
 
     def decorate(self, *args, **kwargs):
         index: IndexMetadataModel
@@ -127,34 +134,16 @@ class NavigationBuilder:
         if kwargs:
             _, = kwargs
         navigation, navigation_info, citation_trees, max_cite_depth = content
-        prefix, namespace, nsmap = nsmp()
 
-        member = None
-        if navigation is not None:
-            member = [
-                CitableUnit(
-                    type='CitableUnit',
-                    identifier=cite_unit.get('ref'),
-                    level=cite_unit.get('level'),
-                    parent=cite_unit.get('parent'),
-                    cite_type=cite_unit.get('unit'),
-                    dublin_core = term_extractor(cite_unit, nsmap) if cite_unit is not None else None
-                ) for cite_unit in navigation
-            ] if len(navigation) else []
+        # members stay TOC rows until the page is selected
+        member = navigation
 
         ref, start, end = navigation_info
 
         if ref is not None:
-            ref = CitableUnit(
-                type="CitableUnit",
-                identifier=ref.get('ref'),
-                level=ref.get('level'),
-                parent=ref.get('parent'),
-                cite_type=ref.get('unit'),
-                dublin_core=term_extractor(ref, nsmap) if ref is not None else None
-            )
             if member is not None and len(member) and ref not in member:
                 member.insert(0, ref)
+            ref = self.citable_unit(ref)
             self.navigation = self.representation_model(
                 id=index.id,
                 ref=ref,
@@ -165,22 +154,8 @@ class NavigationBuilder:
             )
 
         elif start is not None and end is not None:
-            start = CitableUnit(
-                type="CitableUnit",
-                identifier=start.get('ref'),
-                level=start.get('level'),
-                parent=start.get('parent'),
-                cite_type=start.get('unit'),
-                dublin_core=term_extractor(start, nsmap) if start is not None else None
-            )
-            end = CitableUnit(
-                type="CitableUnit",
-                identifier=end.get('ref'),
-                level=end.get('level'),
-                parent=end.get('parent'),
-                cite_type=end.get('unit'),
-                dublin_core = term_extractor(end, nsmap) if end is not None else None
-            )
+            start = self.citable_unit(start)
+            end = self.citable_unit(end)
             self.navigation = self.representation_model(
                 id = index.id,
                 start=start,
@@ -211,9 +186,17 @@ class NavigationBuilder:
 
         # set paginated items and view
         # todo: harmonizing model field names with Collection model
-        self.navigation.member = paginated_member_array if len(paginated_member_array) else []
+        self.navigation.member = [self.citable_unit(row) for row in paginated_member_array]
         self.navigation.view = partial_view
 
+    @staticmethod
+    def citable_unit(row: tuple) -> CitableUnit:
+        """
+        :param row: TOC row (ref, level, parent, unit, dublin core terms)
+        """
+        ref, level, parent, unit, terms = row
+        return CitableUnit(type='CitableUnit', identifier=ref, level=level, parent=parent, cite_type=unit, dublin_core=terms)
+
     def decorate(self, *args, **kwargs) -> T:
         representation, params, = args
         if kwargs:
@@ -235,7 +218,7 @@ class ContentBuilder(Protocol):
     def get_root(down, toc, nsmap):
         ...
     @staticmethod
-    def get_content(ref, down, toc, nsmap):
+    def get_content(ref, down, toc):
         ...
     @staticmethod
     def get_milestone(*args, **kwargs):
@@ -262,7 +245,7 @@ class CollectionContentBuilder:
         ...
 
     @staticmethod
-    def get_content(ref, down, toc, nsmap):
+    def get_content(ref, down, toc):
         ...
 
     @staticmethod
@@ -295,26 +278,26 @@ class NavigationContentBuilder:
         return pick_root(int(down), toc)
 
     @staticmethod
-    def get_content(ref, down, toc, nsmap):
+    def get_content(ref, down, toc):
         # todo : insert here strategy pattern for selecting sort & search algorithms
         siblings: list = []
         element: Element
         if int(down) == 0:
-            element = pick_ref_parent(ref, toc, nsmap)
+            element = pick_ref_parent(ref, toc)
             if element:
-                siblings: list = pick_ref_siblings(element, [], element.get('level'))
+                siblings: list = pick_ref_siblings(element, toc, element.get('level'))
             else:
                 return pick_root(1, toc)
 
         elif int(down) >= 1:
-            element = pick_ref(ref, toc, nsmap)
-            siblings: list = pick_ref_siblings(element, [], element.get('level'), int(down) - 1)
+            element = pick_ref(ref, toc)
+            siblings: list = pick_ref_siblings(element, toc, element.get('level'), int(down) - 1)
 
         elif int(down) == -1:
-            element = pick_ref(ref, toc, nsmap)
-            siblings: list = pick_ref_siblings(element, [], element.get('level'), int(down))
+            element = pick_ref(ref, toc)
+            siblings: list = pick_ref_siblings(element, toc, element.get('level'), int(down))
 
-        element = pick_ref(ref, toc, nsmap)
+        element = pick_ref(ref, toc)
         if is_request_out_of_range(int(element.get('level')), int(down), siblings):
             return []
         return siblings
@@ -325,8 +308,8 @@ class NavigationContentBuilder:
         if kwargs:
             _, = kwargs
 
-        start_element: Element = pick_ref_parent(start, toc, nsmap)
-        end_element: Element = pick_ref_parent(end, toc, nsmap)
+        start_element: Element = pick_ref_parent(start, toc)
+        end_element: Element = pick_ref_parent(end, toc)
         if start_element is None and end_element is not None:
             raise BadRangeError(f"range error : start({start}) and end({end}) references are not on the same level")
         if start_element is not None and end_element is None:
@@ -334,8 +317,8 @@ class NavigationContentBuilder:
 
         if start_element is None and end_element is None:
 
-            start_element = pick_ref(start, toc, nsmap)
-            end_element = pick_ref(end, toc, nsmap)
+            start_element = pick_ref(start, toc)
+            end_element = pick_ref(end, toc)
 
             if start_element.get('level') == end_element.get('level'):
                 tmp = pick_root(1, toc)
@@ -343,8 +326,8 @@ class NavigationContentBuilder:
                 item: CitableUnit | Element
                 milestone = []
                 for item in narrow_selection:
-                    element = pick_ref(item.get('ref'), toc, nsmap)
-                    siblings = pick_ref_siblings(element, [], element.get('level'),
+                    element = pick_ref(item.get('ref'), toc)
+                    siblings = pick_ref_siblings(element, toc, element.get('level'),
                                                          int(down) - 1 if int(down) > 0 else -1)
                     siblings.insert(0, item)
                     milestone = milestone + siblings
@@ -354,13 +337,13 @@ class NavigationContentBuilder:
 
         elif start_element.get('level') == end_element.get('level'):
 
-            parent_element = pick_ref_parent(start, toc, nsmap)
-            siblings: list = pick_ref_siblings(parent_element, [], parent_element.get('level'))
+            parent_element = pick_ref_parent(start, toc)
+            siblings: list = pick_ref_siblings(parent_element, toc, parent_element.get('level'))
             narrow_selection = narrower(siblings, start, end)
             item: Element
             milestone = []
             for item in narrow_selection:
-                siblings = pick_ref_siblings(item, [], item.get('level'),
+                siblings = pick_ref_siblings(item, toc, item.get('level'),
                                                      int(down) - 1 if int(down) > 0 else -1)
                 siblings.insert(0, item)
                 milestone = milestone + siblings
@@ -374,11 +357,11 @@ class NavigationContentBuilder:
     def get_navigation_info(toc, nsmap, ref=None, start=None, end=None):
 
         if start and end:
-            start_element = pick_ref(start, toc, nsmap)
-            end_element = pick_ref(end, toc, nsmap)
+            start_element = pick_ref(start, toc)
+            end_element = pick_ref(end, toc)
             return [None, start_element, end_element]
         else:
-            return [pick_ref(ref, toc, nsmap), None, None]
+            return [pick_ref(ref, toc), None, None]
 
     def get_navigation(self):
         return self.navigation
@@ -395,16 +378,15 @@ class DocumentContentBuilder:
     def get_citation_trees(self, citation_trees: Element) -> tuple[list, int]:
         ...
 
-    def get_root(self, dts_resource):
-        return dts_resource.find('Document', namespaces=self.nsmap)
+    def get_root(self, dts_resource: DtsResource) -> Element:
+        return dts_resource.root
 
     def get_content(self, *args):
         builder: ContentBuilder
         toc, ref, tree, document = args
 
-        fragment = pick_ref(ref, toc, self.nsmap)
-        populate_content(fragment, document, self.nsmap)
-        return [fragment]
+        # fragments reference the cached document, they are serialized without being copied
+        return [select_fragment(pick_ref(ref, toc), document)]
     @staticmethod
     def get_milestone(*args, **kwargs):
         builder: ContentBuilder
@@ -412,31 +394,23 @@ class DocumentContentBuilder:
         if kwargs:
             _, = kwargs
 
-        start_element: Element = pick_ref_parent(start, toc, nsmap)
-        end_element: Element = pick_ref_parent(end, toc, nsmap)
+        start_element: Element = pick_ref_parent(start, toc)
+        end_element: Element = pick_ref_parent(end, toc)
 
         if start_element is None and end_element is None:
 
-            start_element = pick_ref(start, toc, nsmap)
-            end_element = pick_ref(start, toc, nsmap)
+            start_element = pick_ref(start, toc)
+            end_element = pick_ref(start, toc)
 
             if start_element.get('level') == end_element.get('level'):
                 tmp = pick_root(1, toc)
-                narrow_selection = narrower(tmp, start, end)
-                item: Element
-                for item in narrow_selection:
-                    populate_content(item, document, nsmap)
-                return narrow_selection
+                return [select_fragment(item, document) for item in narrower(tmp, start, end)]
 
         elif start_element.get('level') == end_element.get('level'):
 
-            parent_element = pick_ref_parent(start, toc, nsmap)
-            siblings: list = pick_ref_siblings(parent_element, [], parent_element.get('level'))
-            narrow_selection = narrower(siblings, start, end)
-            item: Element
-            for item in narrow_selection:
-                populate_content(item, document, nsmap)
-            return narrow_selection
+            parent_element = pick_ref_parent(start, toc)
+            siblings: list = pick_ref_siblings(parent_element, toc, parent_element.get('level'))
+            return [select_fragment(item, document) for item in narrower(siblings, start, end)]
 
         elif start_element.get('level') != end_element.get('level'):
             raise BadRangeError(f"range error : ref '{start}' (level {start_element.get('level')}) and ref '{end}' (level {end_element.get('level')}) references are not on the same level")
@@ -0,0 +1,117 @@
+import hashlib
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from dts_api.classes.Cache import Cache, CacheNamespace
+from dts_api.classes.Store import Store
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Cache of the rendered responses of the DTS endpoints, with strong ETags and conditional requests.
+
+    Responses are keyed by their normalized route and query parameters and stamped with the version of their sources:
+    the metadata file, the revision of the requested entry, the source file of a resource and the generation of the
+    cache, which changes on reset. A collection is not stamped with the files of its members: their changes bump its
+    revision (see Store.get_stamp and CorpusWatcher).
+    A request whose If-None-Match matches the ETag of the cached response is answered with a 304.
+    HTML views are not stored, they depend on the stylesheet version and are cached by the HtmlDesigner.
+    """
+
+    routes: tuple = ('collection', 'navigation', 'document')
+    # largest cached body, as a fraction of the namespace budget: a streamed document cannot evict the other responses
+    max_entry_ratio: int = 16
+
+    def __init__(self, app, prefix: str = "/api/dts/v1"):
+        super().__init__(app)
+        self.prefix = prefix
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        key = self.get_key(request)
+        if key is None:
+            return await call_next(request)
+
+        cache: CacheNamespace = Cache().namespace('response')
+        version = self.get_version(key)
+        if version is None:
+            # unknown entry, the route answers the error
+            return await call_next(request)
+        etag = self.get_etag(version, key)
+
+        # the ETag only depends on the versions of the sources: a revalidation needs no rendering, cached or not
+        if self.matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers={'ETag': etag})
+
+        cached = cache.get(key, version=version)
+        if cached is not None:
+            body, content_type = cached
+            return Response(content=body, headers={'Content-Type': content_type, 'ETag': etag})
+
+        response = await call_next(request)
+        content_type = response.headers.get('content-type', '')
+        if response.status_code != 200 or content_type.startswith('text/html'):
+            return response
+
+        response.headers['ETag'] = etag
+        response.body_iterator = self.store(response.body_iterator, cache, key, version, content_type,
+                                            cache.max_bytes // self.max_entry_ratio)
+        return response
+
+    def get_key(self, request: Request) -> tuple | None:
+        """
+        :return: the normalized route and query parameters of a cacheable request, None otherwise
+        """
+        if request.method != 'GET' or not request.url.path.startswith(self.prefix):
+            return None
+        route = request.url.path[len(self.prefix):].strip('/')
+        if route not in self.routes:
+            return None
+        return route, tuple(sorted(request.query_params.multi_items()))
+
+    @staticmethod
+    def get_version(key: tuple) -> str | None:
+        """
+        :return: the version of the sources of a response, None when the requested entry does not exist
+        """
+        store = Store()
+        params = dict(key[1])
+        entry_id = params.get('resource') or params.get('id') or store.settings.root_collection
+        entries = store.get_index_entry(entry_id)
+        if not entries:
+            return None
+        # a single stat, read before the revision that it bumps when the file changed
+        stamp = store.get_stamp(entries[0]) if entries[0].type.lower() == 'resource' and entries[0].location else None
+        return f"{store.version}:{store.get_revision(entry_id)}:{Cache().generation}:{stamp}"
+
+    @staticmethod
+    def get_etag(version: str, key: tuple) -> str:
+        return '"%s"' % hashlib.sha1(f"{version}:{key!r}".encode()).hexdigest()
+
+    @staticmethod
+    def matches(if_none_match: str | None, etag: str) -> bool:
+        if if_none_match is None:
+            return False
+        # If-None-Match uses the weak comparison
+        candidates = [candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')]
+        return '*' in candidates or etag in candidates
+
+    @staticmethod
+    async def store(body_iterator, cache: CacheNamespace, key: tuple, version: str, content_type: str, max_size: int):
+        """
+        forward the chunks of the response and cache the whole body once it is sent
+
+        bodies larger than max_size are forwarded without being kept, their chunks are released as they are sent
+        """
+        chunks: list[bytes] | None = []
+        size = 0
+        async for chunk in body_iterator:
+            if chunks is not None:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > max_size:
+                    chunks = None
+            yield chunk
+        if chunks is not None:
+            cache.set(key, (b''.join(chunks), content_type), size=size, version=version)
@@ -1,10 +1,14 @@
+import hashlib
 from threading import Lock
 from typing import TypeVar
 
 from dts_api.classes.Adapter import JsonAdapter, DefaultIngestor, DefaultExtractor, Adapter
+from dts_api.classes.Cache import Cache
 from dts_api.classes.FileStorage import FileStorage, LocalFileStorage, GithubFileStorage
-from dts_api.classes.Indexer import DefaultIndexer
-from dts_api.classes.Utils import default_index_algorithm, pta_index_algorithm
+from dts_api.classes.Indexer import DefaultIndexer, IndexLookup
+from dts_api.classes.TocIndex import TocIndex
+from dts_api.classes.TocStore import TocStore
+from dts_api.classes.Utils import default_index_algorithm, pta_index_algorithm, freeze
 from dts_api.model.MetadataModel import IndexMetadataModel
 from dts_api.settings.settings import get_settings
 
@@ -25,12 +29,26 @@ class StoreMeta(type):
 
     def get_document(self, *args, **kwargs) -> T:
         ...
+    def get_cite_structure(self, *args, **kwargs):
+        ...
     def get_index_entry(self, *args, **kwargs):
         ...
+    def get_stamp(self, *args, **kwargs):
+        ...
     def get_index_count(self, *args, **kwargs):
         ...
     def get_index_children_count(self, *args, **kwargs):
         ...
+    def get_revision(self, *args, **kwargs):
+        ...
+    def bump_revision(self, *args, **kwargs):
+        ...
+    def reload(self, *args, **kwargs):
+        ...
+    def load_toc(self, *args, **kwargs):
+        ...
+    def save_toc(self, *args, **kwargs):
+        ...
     def attach_adapter(self, adapter):
         ...
     def attach_fs(self, fs):
@@ -59,54 +77,128 @@ class Store(metaclass=StoreMeta):
                     self.fs: FileStorage = GithubFileStorage(self.settings.base_path, self.settings.metadata_path)
 
             self.indexer = DefaultIndexer(default_index_algorithm, self.fs, self.md_adapter)
-            self.index = self.indexer.run()
+            # metadata is parsed once and shared read-only by the index entries and the requests
+            raw_metadata = self.fs.open_document()
+            self.metadata = freeze(self.md_adapter.extract(raw_metadata))
+            # the corpus version stamps the rendered responses and their ETags, with the revision of the requested entry
+            self.version: str = hashlib.sha1(raw_metadata if isinstance(raw_metadata, bytes) else raw_metadata.encode()).hexdigest()
+            # id -> number of changes of the entry (or of its children) since startup, see CorpusWatcher and reload
+            self.revisions: dict[str, int] = {}
+            # id -> last stamp seen of the source file of a resource, see get_stamp
+            self.stamps: dict[str, tuple | None] = {}
+            self._lock: Lock = Lock()
+            self.index = self.indexer.run(self.metadata)
+            # id -> entries, so that lookups do not scan the index
+            self.lookup: IndexLookup = self.indexer.build_lookup(self.index)
+
+            # precomputed TOCs are only available with a local storage
+            self.toc_store: TocStore | None = None
+            if self.settings.toc_artifacts and self.settings.storage == 'local':
+                self.toc_store = TocStore(self.settings.base_path, self.settings.toc_artifacts_path)
 
     def get_document(self, document_id: str | IndexMetadataModel = None) -> T:
         if document_id is None:
-            return self.md_adapter.extract(self.fs.open_document())
+            return self.metadata
         else:
             return self.fs.open_document(document_id)
 
+    def get_cite_structure(self, document_id: IndexMetadataModel):
+        """
+        :return: the refsDecl element of a resource, without parsing the document body
+        """
+        return self.fs.open_cite_structure(document_id)
+
+    def get_stamp(self, document_id: IndexMetadataModel) -> tuple | None:
+        """
+        a changed stamp bumps the revision of the resource and of the collections listing it
+
+        :return: version of the source file of a resource, None when the storage cannot tell
+        """
+        stamp = self.fs.stamp(document_id)
+        previous = self.stamps.get(document_id.id, stamp)
+        self.stamps[document_id.id] = stamp
+        if stamp != previous:
+            entries = self.get_index_entry(document_id.id)
+            self.bump_revision(document_id.id, *{entry.parent_id for entry in entries if entry.parent_id})
+        return stamp
+
     def get_index_entry(self, *args) -> list[IndexMetadataModel] | None:
 
         collection_id, = args
 
-        i: IndexMetadataModel
-        index_entries: list = []
-
         if collection_id is None:
             try:
                 return [self.index[0]]
             except:
                 raise ValueError("No collection found in index")
-        else:
-            for i in self.index:
-                if i.id == collection_id:
-                    index_entries.append(i)
-        return index_entries
+        return self.lookup.get(collection_id)
 
     def get_index_count(self, *args) -> int:
         collection_id, = args
-
-        i: IndexMetadataModel
-        index_entries: list = []
-        for i in self.index:
-            if i.id == collection_id and i.depth:
-                index_entries.append(i)
-
-        return len(index_entries)
+        return self.lookup.count_parents(collection_id)
 
     def get_index_children_count(self, *args) -> int:
         collection_id, = args
-
-        i: IndexMetadataModel
-
-        counter = 0
-        for i in self.index:
-            if i.id == collection_id:
-                counter += i.children_count
-
-        return counter
+        return self.lookup.count_children(collection_id)
+
+    def get_revision(self, collection_id: str | None) -> int:
+        return self.revisions.get(collection_id, 0)
+
+    def bump_revision(self, *collection_ids: str):
+        """
+        mark entries as changed in place: their rendered responses are stale
+        """
+        with self._lock:
+            for collection_id in collection_ids:
+                self.revisions[collection_id] = self.revisions.get(collection_id, 0) + 1
+
+    def reload(self) -> list[str]:
+        """
+        read the metadata file again and swap in its index
+
+        the new index is built off to the side and compared to the current one: the cached entries and the
+        revision of the added, removed and changed ids are invalidated, the other ids stay cached
+
+        :return: ids of the changed entries
+        """
+        raw_metadata = self.fs.open_document()
+        metadata = freeze(self.md_adapter.extract(raw_metadata))
+        index = self.indexer.run(metadata)
+        lookup: IndexLookup = self.indexer.build_lookup(index)
+
+        changed = {entry_id for entry_id in {**self.lookup.entries, **lookup.entries}
+                   if self.signature(self.lookup.get(entry_id)) != self.signature(lookup.get(entry_id))}
+        # unchanged resources keep the citation trees read from their header
+        for entry in index:
+            if entry.id not in changed:
+                previous = self.lookup.get(entry.id)[0]
+                entry.deployed_citation_trees, entry.deployed_stamp = previous.deployed_citation_trees, previous.deployed_stamp
+
+        version = hashlib.sha1(raw_metadata if isinstance(raw_metadata, bytes) else raw_metadata.encode()).hexdigest()
+        with self._lock:
+            self.metadata, self.index, self.lookup, self.version = metadata, index, lookup, version
+        cache = Cache()
+        for entry_id in changed:
+            cache.drop(entry_id)
+        self.bump_revision(*changed)
+        return sorted(changed)
+
+    @staticmethod
+    def signature(entries: list[IndexMetadataModel]) -> list[tuple]:
+        # a collection node holds its children: a change in a member changes its collections as well
+        return [(entry.model_dump(), entry.node) for entry in entries]
+
+    def load_toc(self, document_id: IndexMetadataModel, tree: str) -> TocIndex | None:
+        if self.toc_store is None:
+            return None
+        return self.toc_store.load(document_id, tree)
+
+    def save_toc(self, document_id: IndexMetadataModel, tree: str, toc: TocIndex, stamp: tuple | None = None):
+        """
+        :param stamp: stamp of the source file taken before the document was read (see TocStore.save)
+        """
+        if self.toc_store is not None:
+            self.toc_store.save(document_id, tree, toc, stamp)
 
     def attach_adapter(self, adapter):
         self.md_adapter = adapter
@@ -1,15 +1,17 @@
-from typing import Union
+from typing import Union, Mapping
 
+from fastapi import HTTPException
 from lxml.etree import Element
 from websockets import Protocol
 
-from dts_api.classes.Cache import Cache
+from dts_api.classes.Cache import Cache, estimate_size
 from dts_api.classes.ContentExtractor import ContentExtractor, JsonContentExtractor
 from dts_api.classes.DtsResource import DtsResource
 from dts_api.classes.Error import CollectionNotFoundError, ResourceNotFoundError
 from dts_api.classes.Indexer import Indexer
 from dts_api.classes.Pipeline import TocPipelineBuilder
 from dts_api.classes.Store import Store
+from dts_api.classes.TocIndex import TocIndex
 from dts_api.classes.Utils import nsmp
 from dts_api.errors.CustomError import MetadataValidationError
 from dts_api.model.MetadataModel import IndexMetadataModel
@@ -34,8 +36,7 @@ class CommonStoreKeeper:
         self.nsmap = nsmap
         self.prefix = prefix
         self.namespace = namespace
-        self.dts_resource = DtsResource(self.namespace, self.nsmap)
-        self.pipeline = TocPipelineBuilder().get_pipeline()
+        self.pipeline_builder = TocPipelineBuilder()
         self.cache: Cache = Cache()
 
     def get_content(self, params: collection_params):
@@ -49,28 +50,73 @@ class CommonStoreKeeper:
         if item.type == 'collection':
             raise ResourceNotFoundError("this resource is a collection")
 
-        if not self.cache.get(item.id) or self.cache.get(item.id)[4] != params.tree:
-            document, cite_metadata, cite_structure = self.store.get_document(item)
-            args = [*self.store.get_document(item), params.tree, self.nsmap]
-
-            # todo: move this to chain of responsibility pattern
-            toc: Element = self.pipeline(*args)
-            self.cache.set(item.id, (toc, document, cite_metadata, cite_structure, params.tree))
-        else:
-            toc, document, cite_metadata, cite_structure, last_selected_tree = self.cache.get(item.id)
+        toc: TocIndex = self.get_toc(item, params.tree)
+        document, cite_metadata, cite_structure = self.load_resource(item)
 
         # todo: move this inside the store.get_document method
         citation_trees = set_citation_trees(None, cite_metadata, cite_structure, params.tree, None)[1]
 
-        self.dts_resource.set_dts_resource(params.resource, self.namespace, self.nsmap, document, cite_structure, toc)
+        # lightweight view on the cached document and TOC, built for each request
+        dts_resource = DtsResource(
+            params.resource, document, cite_structure, toc.toc, self.namespace,
+            selection=(params.ref, params.start, params.end, params.tree),
+            stylesheet=getattr(params, 'stylesheet', 'default'), version=self.store.get_stamp(item)
+        )
 
         payload = {
             **params.model_dump(),
-            "dts_resource": self.dts_resource.dts_resource,
-            "cite_structure": citation_trees, "document": document
+            "dts_resource": dts_resource,
+            "cite_structure": citation_trees, "document": document,
+            "toc": toc
         }
         # return navigation, navigation_info, citation_trees, max_cite_depth
-        return item, self.content_extractor.extract_content(**payload)
+        try:
+            return item, self.content_extractor.extract_content(**payload)
+        except HTTPException as error:
+            if error.status_code == 409:
+                # outdated TOC, the next request builds it again from the current document
+                self.cache.namespace('toc').delete((item.id, params.tree))
+            raise
+
+    def get_toc(self, item: IndexMetadataModel, tree: str) -> TocIndex:
+        """
+        get the TOC of a resource for a citation tree, from the cache or by running the TOC pipeline
+
+        :return: the TOC index
+        """
+        # one TOC per citation tree, concurrent trees of a resource live side by side;
+        # stamped as the cached document, an edited file gets a new TOC
+        stamp = self.store.get_stamp(item)
+        cached = self.cache.namespace('toc').get((item.id, tree), version=stamp)
+        if cached is not None:
+            return cached
+
+        # precomputed artifact first, the document is only parsed when the pipeline has to run
+        toc: TocIndex = self.store.load_toc(item, tree)
+        if toc is None:
+            document, cite_metadata, cite_structure = self.load_document(item)
+            toc = self.build_toc(document, cite_metadata, cite_structure, tree)
+            self.store.save_toc(item, tree, toc, stamp)
+        return self.cache_toc(item, tree, toc, stamp)
+
+    def load_document(self, item: IndexMetadataModel) -> tuple:
+        # read-only master document, shared by all the trees of the resource
+        return self.store.get_document(item)
+
+    def load_resource(self, item: IndexMetadataModel) -> tuple:
+        """
+        :return: tuple (document, citation trees metadata, refsDecl element) of a request, from the document cache
+        """
+        return self.load_document(item)
+
+    def build_toc(self, document, cite_metadata, cite_structure, tree: str) -> TocIndex:
+        # todo: move this to chain of responsibility pattern
+        return self.pipeline_builder.build_toc(document, cite_metadata, cite_structure, tree, self.nsmap)
+
+    def cache_toc(self, item: IndexMetadataModel, tree: str, toc: TocIndex, stamp: tuple | None = None) -> TocIndex:
+        # only the TOC is kept: the document stays bounded by the document cache budget
+        self.cache.namespace('toc').set((item.id, tree), toc, size=estimate_size(toc), version=stamp)
+        return toc
 
 class CollectionStoreKeeper(CommonStoreKeeper) :
 
@@ -86,36 +132,27 @@ class CollectionStoreKeeper(CommonStoreKeeper) :
 
         main_entry = index_entries[0]
 
-        cache_id: str = '-'.join(str(key) + str(value) for key, value in params.model_dump().items())
-        if not self.cache.get(cache_id):
-            md = self.store.get_document()
-            self.cache.set(cache_id, md)
-        else:
-            md = self.cache.get(cache_id)
-
         path: str
         content: dict
 
+        # entries point to their metadata node, shallow copies keep the shared metadata untouched
         if params.nav == 'parents' and main_entry.depth:
-            main_content = self.metadata_extractor.extract_content(md, main_entry.path)
-            main_content['children'] = [self.metadata_extractor.extract_content(md, entry.parent) for entry in index_entries]
-            content = main_content
+            content = dict(self.get_node(main_entry))
+            content['children'] = [self.get_parent_node(entry) for entry in index_entries]
         elif params.nav == 'parents' and not main_entry.depth:
-            main_content = self.metadata_extractor.extract_content(md, main_entry.path)
-            main_content['children'] = []
-            content = main_content
+            content = dict(self.get_node(main_entry))
+            content['children'] = []
         else:
-            path = main_entry.path
-            content = self.metadata_extractor.extract_content(md, path)
+            content = dict(self.get_node(main_entry))
             if "children" in content:
-                children = [child for child in content["children"] if child.get('type', '').lower() == 'resource']
-                for i, child in enumerate(children):
-                    child_md: IndexMetadataModel = self.store.get_index_entry(child['id'])[0]
-                    if child_md.citation_trees:
-                        tree, citation_tree, cite_structure = self.store.get_document(child_md)
-                        tmp_citation_trees = set_citation_trees(None, citation_tree, cite_structure, None, None)[1]
-                        citation_trees, max_cite_depth = self.content_extractor.extract_content(structure=tmp_citation_trees)
-                        content['children'][i]['CitationTrees'] = citation_trees
+                # members come from the adjacency of the index, in metadata order
+                members = self.get_members(main_entry)
+                content['children'] = [dict(self.get_node(member)) for member in members]
+                for child, member in zip(content['children'], members):
+                    if member.type.lower() != 'resource':
+                        continue
+                    if member.citation_trees:
+                        child['CitationTrees'] = self.get_citation_trees(member)
                     else:
                         raise MetadataValidationError(errors=[{
                             'type': 'MetadataValidationError',
@@ -131,7 +168,55 @@ class CollectionStoreKeeper(CommonStoreKeeper) :
 
         return main_entry, content
 
+    def get_members(self, entry: IndexMetadataModel) -> list[IndexMetadataModel]:
+        """
+        :return: index entries of the children of a collection, a member listed in several collections
+                 is taken with this collection as parent
+        """
+        members = []
+        for child_id in entry.children_ids:
+            child_entries = self.store.get_index_entry(child_id)
+            members.append(next((child for child in child_entries if child.parent_id == entry.id), child_entries[0]))
+        return members
+
+    def get_citation_trees(self, entry: IndexMetadataModel) -> list:
+        """
+        CitationTrees descriptors of a resource, read from its refsDecl and kept in the index entries
+        until its source file changes
+
+        :return: list of citation trees, shared read-only by the listings
+        """
+        stamp = self.store.get_stamp(entry)
+        if entry.deployed_citation_trees is None or entry.deployed_stamp != stamp:
+            cite_structure = self.store.get_cite_structure(entry)
+            tmp_citation_trees = set_citation_trees(None, entry.citation_trees, cite_structure, None, None)[1]
+            citation_trees, max_cite_depth = self.content_extractor.extract_content(structure=tmp_citation_trees)
+            for resource_entry in self.store.get_index_entry(entry.id):
+                resource_entry.deployed_citation_trees = citation_trees
+                resource_entry.deployed_stamp = stamp
+        return entry.deployed_citation_trees
+
+    def get_node(self, entry: IndexMetadataModel) -> Mapping:
+        """
+        :return: the metadata dict of an index entry
+        """
+        if entry.node is not None:
+            return entry.node
+        return self.metadata_extractor.extract_content(self.store.get_document(), entry.path)
+
+    def get_parent_node(self, entry: IndexMetadataModel) -> Mapping:
+        """
+        :return: the metadata dict of the parent of an index entry
+        """
+        if entry.node is not None:
+            return self.store.get_index_entry(entry.parent_id)[0].node
+        return self.metadata_extractor.extract_content(self.store.get_document(), entry.parent)
+
 class NavigationStoreKeeper(CommonStoreKeeper):
-    ...
+
+    def load_resource(self, item: IndexMetadataModel) -> tuple:
+        # navigation reads the TOC and the citation trees only, the body of the document is not needed
+        return None, item.citation_trees, self.store.get_cite_structure(item)
+
 class DocumentStoreKeeper(CommonStoreKeeper):
     ...
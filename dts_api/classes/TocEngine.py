@@ -0,0 +1,128 @@
+import re
+from collections import Counter
+
+from lxml import etree
+from lxml.etree import Element, ElementTree, _Element
+
+from dts_api.classes.TocIndex import TocIndex
+from dts_api.classes.Utils import nsmp
+from dts_api.classes.XPathRegistry import CompiledCiteStructure, XPathRegistry
+
+
+class TocEngine:
+    """
+    Single pass table of content (TOC) builder.
+
+    The citation tree is compiled into one XPath per citeStructure (see XPathRegistry), each evaluated once on the document.
+    The document is then walked once, in document order, through the ancestors of the matched elements:
+    CitableUnits are emitted with their full ref, parent and level, and the element paths are counted on
+    the way instead of being recomputed per element. The document and the refsDecl are only read.
+
+    The TOC is identical to the one of the tag_original_document / build_toc / complete_ref pipeline.
+    """
+
+    def build(self, document: ElementTree, tree: _Element, tree_name: str) -> TocIndex:
+        """
+        :param document: source document, read-only
+        :param tree: root citeStructure of the selected citation tree, read-only
+        :return: indexed TOC of the citation tree
+        """
+        prefix, namespace, nsmap = nsmp()
+        structures = XPathRegistry().get(tree, tree_name)
+
+        # matched elements, with their citeStructures in refsDecl order
+        matches: dict[_Element, list[CompiledCiteStructure]] = {}
+        # parent element of the metadata nodes -> (node, property), in refsDecl order
+        metadata: dict[_Element, list[tuple[_Element, str]]] = {}
+        for structure in structures:
+            for element in structure.xpath(document):
+                matches.setdefault(element, []).append(structure)
+        for structure in structures:
+            for cite_property, xpath in structure.cite_data:
+                if "http://purl.org/dc/elements" not in cite_property and "http://purl.org/dc/terms" not in cite_property:
+                    continue
+                for node in xpath(document):
+                    metadata.setdefault(node.getparent(), []).append((node, cite_property))
+
+        # the walk only enters the ancestors of the matched elements
+        ancestors: set[_Element] = set()
+        for element in matches:
+            parent = element.getparent()
+            while parent is not None and parent not in ancestors:
+                ancestors.add(parent)
+                parent = parent.getparent()
+
+        root: _Element = Element('CitationTree', nsmap=nsmap)
+        root.set('tree', tree_name)
+        # units with a lower level than the current one, the last of them is the candidate parent
+        stack: list[tuple[int, str]] = []
+
+        walk: list[tuple[_Element, str]] = [(document.getroot(), ".")]
+        while walk:
+            element, path = walk.pop()
+            if element in matches:
+                units = matches[element]
+                for position, structure in enumerate(units):
+                    # the metadata of an element goes to the last of its units
+                    terms = metadata.get(element) if position == len(units) - 1 else None
+                    self.emit(root, stack, element, path, structure, terms, namespace, nsmap)
+            if element not in ancestors:
+                continue
+
+            counts = Counter(child.tag for child in element.iterchildren(tag=etree.Element))
+            seen: Counter = Counter()
+            children = []
+            for child in element.iterchildren(tag=etree.Element):
+                seen[child.tag] += 1
+                if child in ancestors or child in matches:
+                    step = f"{child.tag}[{seen[child.tag]}]" if counts[child.tag] > 1 else child.tag
+                    children.append((child, step if path == "." else f"{path}/{step}"))
+            walk.extend(reversed(children))
+
+        return TocIndex(ElementTree(root))
+
+    @staticmethod
+    def emit(root: _Element, stack: list, element: _Element, path: str, structure: CompiledCiteStructure,
+             terms: list | None, namespace: str, nsmap: dict):
+        if structure.use == 'position()':
+            position = re.search(r"\[(\d*)]$", path)
+            ref = position.group(1) if position else "1"
+        else:
+            ref = element.get(structure.use[1:])
+
+        unit: _Element = Element(f"{namespace}CitableUnit", nsmap=nsmap)
+        unit.set('ref', ref)
+        unit.set('unit', structure.unit)
+        unit.set('match', structure.match)
+        unit.set('delim', structure.delim)
+        unit.set('fullpath', path)
+        unit.set('level', str(structure.level))
+
+        level = Element("level", nsmap=nsmap)
+        level.text = str(structure.level)
+        dc: Element = Element('DublinCore', nsmap=nsmap)
+        if terms:
+            if len(terms) > 1:
+                positions = {child: index for index, child in enumerate(element)}
+                terms = sorted(terms, key=lambda term: positions[term[0]])
+            for node, cite_property in terms:
+                cite_data: Element = Element(f"{namespace}CitableData", nsmap=nsmap)
+                cite_data.text = node.text
+                # remove all prefixes from attributes keys (not necessarily a good idea...)
+                for key, value in node.attrib.items():
+                    if 'http' in key:
+                        cite_data.set(re.split(r'{.*}', key)[-1], value)
+                cite_data.set('term', cite_property.split("/")[-1])
+                dc.append(cite_data)
+        unit.append(level)
+        unit.append(Element('content', nsmap=nsmap))
+        unit.append(dc)
+
+        # parent: the last unit of a lower level, when it is exactly one level up
+        while stack and stack[-1][0] >= structure.level:
+            stack.pop()
+        if stack and stack[-1][0] == structure.level - 1:
+            unit.set('ref', f"{stack[-1][1]}{structure.delim}{ref}")
+            unit.set('parent', stack[-1][1])
+        stack.append((structure.level, unit.get('ref')))
+        root.append(unit)
@@ -0,0 +1,111 @@
+from lxml.etree import _Element, ElementTree
+
+from dts_api.classes.Utils import nsmp
+
+
+class TocIndex:
+    """
+    Ref index of a table of content (TOC).
+
+    Maps each CitableUnit ref to its element, parent ref, level and document-order position.
+    The index is built once, at the end of the TOC pipeline, and is cached alongside the TOC:
+    ref, parent and sibling lookups are then resolved in constant time instead of scanning the TOC.
+
+    Each unit also has a compact row (ref, level, parent, unit, dublin core terms), the navigation members
+    are materialized from the rows of the requested page only.
+    """
+
+    def __init__(self, toc: ElementTree):
+        self.toc: ElementTree = toc
+        self.units: list[_Element] = []
+        self.levels: list[int] = []
+        self.parents: list[str | None] = []
+        self.ends: list[int] = []
+        self.positions: dict[str, int] = {}
+        self.rows: list[tuple] = []
+        self.build()
+
+    def build(self):
+        """
+        walk the TOC once, in document order, and record for each CitableUnit its position, level, parent
+        and the position right after its last descendant (TOC is flat, descendants follow their ancestor)
+        """
+        stack: list[int] = []
+        unit: _Element
+        prefix, namespace, nsmap = nsmp()
+        for position, unit in enumerate(self.toc.getroot()):
+            level = int(unit.get('level'))
+            self.units.append(unit)
+            self.levels.append(level)
+            self.parents.append(unit.get('parent'))
+            self.ends.append(0)
+            self.rows.append((unit.get('ref'), level, unit.get('parent'), unit.get('unit'), self.extract_terms(unit, nsmap)))
+            # the first occurrence wins, same as a find() on the TOC
+            self.positions.setdefault(unit.get('ref'), position)
+            while stack and self.levels[stack[-1]] >= level:
+                self.ends[stack.pop()] = position
+            stack.append(position)
+        while stack:
+            self.ends[stack.pop()] = len(self.units)
+
+    @staticmethod
+    def extract_terms(unit: _Element, nsmap: dict) -> dict | None:
+        """
+        :return: dublin core terms of a CitableUnit, by term, None when the unit has none
+        """
+        terms = {}
+        for citable in unit.iterfind('.//CitableData', namespaces=nsmap):
+            term = dict(citable.attrib)
+            term['value'] = citable.text
+            del term['term']
+            terms[citable.get('term')] = term
+        return terms if len(terms) else None
+
+    def __len__(self):
+        return len(self.units)
+
+    def position(self, ref: str) -> int | None:
+        return self.positions.get(ref)
+
+    def get(self, ref: str) -> _Element | None:
+        position = self.positions.get(ref)
+        return self.units[position] if position is not None else None
+
+    def level(self, ref: str) -> int | None:
+        position = self.positions.get(ref)
+        return self.levels[position] if position is not None else None
+
+    def parent(self, ref: str) -> _Element | None:
+        position = self.positions.get(ref)
+        if position is None or not self.parents[position]:
+            return None
+        return self.get(self.parents[position])
+
+    def row(self, ref: str) -> tuple | None:
+        position = self.positions.get(ref)
+        return self.rows[position] if position is not None else None
+
+    def rows_of(self, units: list[_Element]) -> list[tuple]:
+        """
+        :return: rows of TOC units, in the given order
+        """
+        return [self.rows[self.positions[unit.get('ref')]] for unit in units]
+
+    def descendants(self, ref: str) -> list[_Element]:
+        """
+        :param ref: reference of a CitableUnit
+        :return: all the CitableUnit following the given ref in the TOC until the next unit of same or lower level
+        """
+        position = self.positions.get(ref)
+        if position is None:
+            return []
+        return self.units[position + 1:self.ends[position]]
+
+    def roots(self, down: int) -> list[_Element]:
+        """
+        :param down: maximum level, -1 for all levels
+        :return: CitableUnits in document order, up to the given level
+        """
+        if down == -1:
+            return list(self.units)
+        return [unit for unit, level in zip(self.units, self.levels) if level <= down]
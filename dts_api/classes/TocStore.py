@@ -0,0 +1,143 @@
+import hashlib
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+from lxml import etree
+from lxml.etree import ElementTree
+
+from dts_api.classes.TocIndex import TocIndex
+from dts_api.classes.Utils import nsmp
+from dts_api.model.MetadataModel import IndexMetadataModel
+
+
+class TocStore:
+    """
+    On-disk store of precomputed tables of content (TOC artifacts).
+
+    One artifact is written per resource and citation tree. Each artifact is tagged with the sha256 hash,
+    the mtime and the size of its source file: an artifact whose source changed is stale and is rebuilt.
+    An artifact whose source was touched without being changed is stamped again, the file is hashed once.
+    """
+
+    # TOC elements built outside the TEI namespace, they inherit the default namespace when parsed back
+    local_tags = ('CitationTree', 'level', 'content', 'DublinCore')
+
+    def __init__(self, base_path: str, artifacts_path: str):
+        self.base_path = Path(base_path)
+        self.path = self.base_path / artifacts_path
+
+    def artifact_path(self, item: IndexMetadataModel, tree: str) -> Path:
+        return self.path / f"{quote(item.id, safe='')}.{quote(tree, safe='')}.xml"
+
+    def source_path(self, item: IndexMetadataModel) -> Path:
+        return self.base_path / item.location
+
+    def source_stamp(self, item: IndexMetadataModel) -> tuple | None:
+        """
+        :return: (mtime, size) of the source file of a resource, None when the file is missing
+        """
+        try:
+            stat = self.source_path(item).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def source_hash(source: Path) -> str:
+        digest = hashlib.sha256()
+        with open(source, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def load(self, item: IndexMetadataModel, tree: str) -> TocIndex | None:
+        """
+        :return: the TOC of a resource for a citation tree, None when the artifact is missing or stale
+        """
+        artifact = self.artifact_path(item, tree)
+        if not artifact.exists():
+            return None
+
+        toc: ElementTree = etree.parse(str(artifact))
+        if not self.is_fresh(item, tree, toc):
+            return None
+        return self.deserialize(toc)
+
+    @classmethod
+    def deserialize(cls, toc: ElementTree) -> TocIndex:
+        """
+        :return: the TOC index of a parsed artifact, with the tags and attributes of a freshly built TOC
+        """
+        root = toc.getroot()
+        for key in ('source-hash', 'source-mtime', 'source-size'):
+            root.attrib.pop(key, None)
+        prefix, namespace, nsmap = nsmp()
+        for element in root.iter(*[f"{namespace}{tag}" for tag in cls.local_tags]):
+            element.tag = element.tag[len(namespace):]
+        return TocIndex(toc)
+
+    @staticmethod
+    def is_stamped(attrib, stamp: tuple | None) -> bool:
+        return stamp is not None and attrib.get('source-mtime') == str(stamp[0]) and attrib.get('source-size') == str(stamp[1])
+
+    def is_fresh(self, item: IndexMetadataModel, tree: str, toc: ElementTree) -> bool:
+        """
+        :param toc: parsed artifact, its stamps are rewritten when the source was touched without being changed
+        """
+        stamp = self.source_stamp(item)
+        root = toc.getroot()
+        if stamp is None:
+            return False
+        if self.is_stamped(root.attrib, stamp):
+            return True
+        # the file has been touched, the artifact is still valid if its content did not change
+        if root.get('source-hash') != self.source_hash(self.source_path(item)) or self.source_stamp(item) != stamp:
+            return False
+        root.set('source-mtime', str(stamp[0]))
+        root.set('source-size', str(stamp[1]))
+        self.write(self.artifact_path(item, tree), root, dict(root.attrib))
+        return True
+
+    def is_stale(self, item: IndexMetadataModel, tree: str) -> bool:
+        artifact = self.artifact_path(item, tree)
+        if not artifact.exists():
+            return True
+        # only the root element is needed to read the source stamps
+        for _, root in etree.iterparse(str(artifact), events=('start',)):
+            if self.is_stamped(root.attrib, self.source_stamp(item)):
+                return False
+            break
+        # the source was touched, the whole artifact is read to be stamped again
+        return not self.is_fresh(item, tree, etree.parse(str(artifact)))
+
+    def save(self, item: IndexMetadataModel, tree: str, toc: TocIndex, stamp: tuple | None = None):
+        """
+        :param stamp: stamp of the source file taken before the document was read (see source_stamp), the
+                      artifact is not written when the file changed since then: it would be built from old content
+        """
+        source = self.source_path(item)
+        if stamp is None:
+            stamp = self.source_stamp(item)
+        source_hash = self.source_hash(source)
+        if stamp is None or self.source_stamp(item) != stamp:
+            return
+        root = toc.toc.getroot()
+        attrib = {
+            **root.attrib,
+            'source-hash': source_hash,
+            'source-mtime': str(stamp[0]),
+            'source-size': str(stamp[1]),
+        }
+        self.write(self.artifact_path(item, tree), root, attrib)
+
+    def write(self, artifact: Path, root: etree._Element, attrib):
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = artifact.with_suffix(f'.{os.getpid()}.tmp')
+        # units are serialized one by one, without being moved out of the cached TOC
+        with etree.xmlfile(str(tmp), encoding='UTF-8') as xf:
+            with xf.element(root.tag, attrib, nsmap=root.nsmap):
+                for unit in root:
+                    xf.write(unit)
+        # atomic swap, concurrent workers never read a partial artifact
+        os.replace(tmp, artifact)
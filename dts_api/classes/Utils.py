@@ -1,7 +1,8 @@
 import math
 import warnings
 
-from typing import Union, List
+from types import MappingProxyType
+from typing import Union, List, Any, Mapping, Sequence
 from urllib.parse import urlunparse
 from collections import deque, namedtuple
 
@@ -12,25 +13,44 @@ from dts_api.model.ParameterModel import CollectionParams, NavigationParams
 from dts_api.model.ViewModel import PartialCollectionView, PaginationParams, UrlComponent
 
 
-def default_index_algorithm(md: dict, sep='.'):
+def freeze(value: Any) -> Any:
+    """
+    read-only copy of a parsed JSON document: dicts become mapping proxies and lists become tuples
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
 
-    queue = deque([(md, '')])
+
+def is_sequence(value: Any) -> bool:
+    return isinstance(value, Sequence) and not isinstance(value, (str, bytes))
+
+
+def default_index_algorithm(md: Mapping, sep='.'):
+
+    # the parent id is carried along the queue, nodes keep a reference to their metadata dict
+    queue = deque([(md, '', None)])
     result = []
     id_counter = 1
 
     while queue:
-        current, path = queue.popleft()
-        if isinstance(current, list):
+        current, path, parent_id = queue.popleft()
+        if is_sequence(current):
             for index, item in enumerate(current):
                 new_path = f"{path}{sep}{index}" if path else str(index)
-                queue.append((item, new_path))
-        elif isinstance(current, dict):
+                queue.append((item, new_path, parent_id))
+        elif isinstance(current, Mapping):
+            node_id = current.get('id', parent_id)
             for key, value in current.items():
                 new_path = f"{path}{sep}{key}" if path else key
                 if key == 'id':
                     children_count: int = 0
+                    children_ids: list = []
                     if 'children' in current:
                         children_count = len(current['children'])
+                        children_ids = [child['id'] for child in current['children'] if isinstance(child, Mapping) and 'id' in child]
                     payload = {
                         'id': value,
                         'type': current['type'],
@@ -38,11 +58,14 @@ def default_index_algorithm(md: dict, sep='.'):
                         'path': new_path,
                         'location': current.get('location', None),
                         'citation_trees': current.get('CitationTrees', None),
+                        'parent_id': parent_id,
+                        'children_ids': children_ids,
+                        'node': current,
                     }
                     result.append(IndexMetadataModel(**payload))
                     id_counter += 1
-                if isinstance(value, (dict, list)):
-                    queue.append((value, new_path))
+                if isinstance(value, Mapping) or is_sequence(value):
+                    queue.append((value, new_path, node_id))
     return result
 
 
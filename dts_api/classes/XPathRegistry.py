@@ -0,0 +1,109 @@
+import hashlib
+import re
+from threading import Lock
+
+from lxml import etree
+from lxml.etree import _Element
+
+from dts_api.classes.Utils import nsmp
+from dts_api.funcs.common import decorate
+
+
+class XPathRegistryMeta(type):
+
+    _instances = {}
+
+    _lock: Lock = Lock()
+
+    def __call__(cls, *args, **kwargs):
+        with cls._lock:
+            if cls not in cls._instances:
+                cls._instances[cls] = super(XPathRegistryMeta, cls).__call__(*args, **kwargs)
+        return cls._instances[cls]
+
+    def get(self, tree, tree_name):
+        ...
+    def clear(self):
+        ...
+
+
+class CompiledCiteStructure:
+    """
+    citeStructure of a citation tree, with its full match path compiled against the document root
+    """
+
+    def __init__(self, match: str, unit: str, use: str, delim: str, level: int, cite_data: list[tuple[str, etree.XPath]], nsmap: dict):
+        self.match = match
+        self.unit = unit
+        self.use = use
+        self.delim = delim
+        self.level = level
+        self.xpath = etree.XPath(match, namespaces=nsmap)
+        # (property, compiled path of the metadata nodes)
+        self.cite_data = cite_data
+
+
+class XPathRegistry(metaclass=XPathRegistryMeta):
+    """
+    Process wide registry of the compiled citation trees.
+
+    The prefixed match and citeData use expressions of a citation tree are compiled once, keyed by the hash of
+    its citeStructure elements and its name: documents sharing an encoding scheme share the compiled XPaths.
+    """
+
+    def __init__(self):
+        self.compiled: dict[tuple[str, str], list[CompiledCiteStructure]] = {}
+        self._lock: Lock = Lock()
+
+    def get(self, tree: _Element, tree_name: str) -> list[CompiledCiteStructure]:
+        """
+        :param tree: root citeStructure of the selected citation tree
+        :return: compiled citeStructures, in refsDecl order
+        """
+        key = (hashlib.sha1(etree.tostring(tree, with_tail=False)).hexdigest(), tree_name)
+        compiled = self.compiled.get(key)
+        if compiled is None:
+            compiled = self.compile(tree)
+            with self._lock:
+                compiled = self.compiled.setdefault(key, compiled)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self.compiled.clear()
+
+    def compile(self, tree: _Element) -> list[CompiledCiteStructure]:
+        prefix, namespace, nsmap = nsmp(prefix='tei')
+        structures: list[CompiledCiteStructure] = []
+        matches: dict[_Element, str] = {}
+        levels: dict[_Element, int] = {}
+
+        for structure in tree.iter(f"{namespace}citeStructure"):
+            parent = structure.getparent()
+            if structure is tree:
+                # the root match is searched anywhere in the document
+                nodes = [f"//{self.decorate_path(node, prefix)}" for node in re.split(r'\s?\|\s?', structure.get('match'))]
+                match = " | ".join(nodes)
+            else:
+                path = self.decorate_path(structure.get('match'), prefix)
+                match = " | ".join(f"{node}/{path}" for node in re.split(r'\s?\|\s?', matches[parent])) \
+                    if "|" in matches[parent] else f"{matches[parent]}/{path}"
+            matches[structure] = match
+            levels[structure] = 1 if structure is tree else levels[parent] + 1
+
+            cite_data = []
+            for data in structure.iterfind(f"{namespace}citeData"):
+                cite_data.append((data.get('property'), etree.XPath(f"{match}/{self.decorate_path(data.get('use'), prefix)}", namespaces=nsmap)))
+
+            structures.append(CompiledCiteStructure(
+                match, structure.get('unit'), structure.get('use'), structure.get('delim') if structure.get('delim') else "",
+                levels[structure], cite_data, nsmap
+            ))
+        return structures
+
+    @staticmethod
+    def decorate_path(path: str, prefix: str) -> str:
+        steps = re.split(r'/{1,2}', path)
+        if "" in steps:
+            steps.remove("")
+        return "/".join(decorate(steps, prefix))
@@ -0,0 +1,61 @@
+import os
+from threading import Lock
+
+from fastapi import HTTPException
+from lxml import etree
+
+from dts_api.settings.settings import settings
+
+
+class XsltRegistryMeta(type):
+
+    _instances = {}
+
+    _lock: Lock = Lock()
+
+    def __call__(cls, *args, **kwargs):
+        with cls._lock:
+            if cls not in cls._instances:
+                cls._instances[cls] = super(XsltRegistryMeta, cls).__call__(*args, **kwargs)
+        return cls._instances[cls]
+
+    def register(self, name, path):
+        ...
+    def get(self, name):
+        ...
+
+class XsltRegistry(metaclass=XsltRegistryMeta):
+    """
+    Process wide registry of the HTML stylesheets, compiled once.
+
+    A stylesheet is compiled again when the mtime of its file changes, the mtime is the stylesheet version.
+    """
+
+    default_stylesheet = "dts_api/transform/html/xml_to_html.xsl"
+
+    def __init__(self):
+        self.paths: dict[str, str] = {'default': self.default_stylesheet, **settings.html_stylesheets}
+        self.compiled: dict[str, tuple[int, etree.XSLT]] = {}
+        self._lock: Lock = Lock()
+
+    def register(self, name: str, path: str):
+        with self._lock:
+            self.paths[name] = path
+            self.compiled.pop(name, None)
+
+    def get(self, name: str = 'default') -> tuple[etree.XSLT, int]:
+        """
+        :return: tuple (compiled stylesheet, version)
+        """
+        if name not in self.paths:
+            raise HTTPException(400, f"stylesheet error : stylesheet '{name}' is not registered")
+
+        path = self.paths[name]
+        version = os.stat(path).st_mtime_ns
+        with self._lock:
+            compiled = self.compiled.get(name)
+            if compiled is None or compiled[0] != version:
+                # parser = etree.XMLParser(remove_comments=True)
+                compiled = (version, etree.XSLT(etree.parse(path)))
+                self.compiled[name] = compiled
+        return compiled[1], compiled[0]
@@ -0,0 +1,71 @@
+"""
+Build the TOC artifacts of every resource and citation tree of the index.
+
+Artifacts are written next to the corpus, in the TOC_ARTIFACTS_PATH directory of BASE_PATH.
+Up-to-date artifacts are skipped unless --force is given.
+
+usage: python -m dts_api.commands.build_toc [--force]
+"""
+import argparse
+import sys
+from typing import Callable
+
+from dts_api.classes.Pipeline import TocPipelineBuilder
+from dts_api.classes.Store import Store
+from dts_api.classes.TocStore import TocStore
+from dts_api.classes.Utils import nsmp
+from dts_api.model.MetadataModel import IndexMetadataModel
+from dts_api.settings.settings import get_settings
+
+
+def indexed_resources(store: Store) -> list[IndexMetadataModel]:
+    """
+    :return: resource entries of the index, a resource listed in several collections is returned once
+    """
+    resources: dict[str, IndexMetadataModel] = {}
+    for entry in store.index:
+        if entry.type.lower() == 'resource' and entry.location and entry.citation_trees:
+            resources.setdefault(entry.id, entry)
+    return list(resources.values())
+
+
+def build_artifacts(store: Store, toc_store: TocStore, force: bool = False, report: Callable = print) -> int:
+    """
+    run the TOC pipeline for each resource and citation tree, and save the resulting artifacts
+
+    :return: number of artifacts written
+    """
+    builder = TocPipelineBuilder()
+    prefix, namespace, nsmap = nsmp()
+    written = 0
+    resources = indexed_resources(store)
+    for position, item in enumerate(resources, start=1):
+        for tree in item.citation_trees:
+            if not force and not toc_store.is_stale(item, tree['name']):
+                report(f"[{position}/{len(resources)}] {item.id} ({tree['name']}): up to date")
+                continue
+            stamp = toc_store.source_stamp(item)
+            document, cite_metadata, cite_structure = store.get_document(item)
+            toc = builder.build_toc(document, cite_metadata, cite_structure, tree['name'], nsmap)
+            toc_store.save(item, tree['name'], toc, stamp)
+            written += 1
+            report(f"[{position}/{len(resources)}] {item.id} ({tree['name']}): built")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the TOC artifacts of the corpus.")
+    parser.add_argument('--force', action='store_true', help="rebuild up-to-date artifacts")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    if settings.storage != 'local':
+        sys.exit("TOC artifacts are only available with a local storage")
+
+    toc_store = TocStore(settings.base_path, settings.toc_artifacts_path)
+    written = build_artifacts(Store(), toc_store, args.force)
+    print(f"{written} TOC artifact(s) written in {toc_store.path}")
+
+
+if __name__ == "__main__":
+    main()
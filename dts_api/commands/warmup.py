@@ -0,0 +1,74 @@
+"""
+Corpus-wide warmup: build the TOC of every resource and citation tree before serving traffic.
+
+TOCs are built in a process pool, serialized back to the main process and loaded in the TOC cache.
+The main process does not parse the documents, the first request of a resource loads its document.
+With TOC_ARTIFACTS enabled, workers load fresh artifacts and save the TOCs they build.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+
+from lxml import etree
+
+from dts_api.classes.Cache import Cache, estimate_size
+from dts_api.classes.Pipeline import TocPipelineBuilder
+from dts_api.classes.Store import Store
+from dts_api.classes.TocStore import TocStore
+from dts_api.classes.Utils import nsmp
+from dts_api.commands.build_toc import indexed_resources
+
+
+def build_resource_tocs(resource_id: str) -> tuple[tuple | None, dict[str, bytes]]:
+    """
+    worker task: build the TOCs of a resource
+
+    :return: stamp of the source file taken before it was read, serialized TOC per citation tree name
+    """
+    store = Store()
+    item = store.get_index_entry(resource_id)[0]
+    builder = TocPipelineBuilder()
+    prefix, namespace, nsmap = nsmp()
+
+    stamp = store.get_stamp(item)
+    tocs: dict[str, bytes] = {}
+    for tree in item.citation_trees:
+        toc = store.load_toc(item, tree['name'])
+        if toc is None:
+            # the document is only parsed for missing or stale artifacts, the storage keeps it for the next trees
+            document, cite_metadata, cite_structure = store.get_document(item)
+            toc = builder.build_toc(document, cite_metadata, cite_structure, tree['name'], nsmap)
+            store.save_toc(item, tree['name'], toc, stamp)
+        tocs[tree['name']] = etree.tostring(toc.toc)
+    return stamp, tocs
+
+
+def warmup(store: Store, workers: int | None = None, report: Callable = print) -> int:
+    """
+    build the TOCs of all the resources in a process pool and load them in the TOC cache
+
+    a resource that fails to build is reported and left to be built on its first request
+
+    :param workers: size of the process pool, defaults to the number of CPUs
+    :return: number of TOCs loaded in the cache
+    """
+    cache = Cache().namespace('toc')
+    resources = {item.id: item for item in indexed_resources(store)}
+    loaded = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(build_resource_tocs, resource_id): resource_id for resource_id in resources}
+        for position, future in enumerate(as_completed(futures), start=1):
+            item = resources[futures[future]]
+            try:
+                stamp, tocs = future.result()
+            except Exception as error:
+                report(f"warmup [{position}/{len(resources)}] {item.id}: failed ({error!r})")
+                continue
+
+            # same entry as CommonStoreKeeper.get_toc, the first request of the resource loads its document
+            for tree, data in tocs.items():
+                toc = TocStore.deserialize(etree.ElementTree(etree.fromstring(data)))
+                cache.set((item.id, tree), toc, size=estimate_size(toc), version=stamp)
+                loaded += 1
+            report(f"warmup [{position}/{len(resources)}] {item.id}: {len(tocs)} TOC(s)")
+    return loaded
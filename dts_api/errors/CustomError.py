@@ -47,6 +47,10 @@ async def not_found_exception_handler(request: Request, exc: HTTPException) -> J
             'type': "bad_request",
             'message': "Bad request."
         },
+        409: {
+            'type': "conflict",
+            'message': "Resource changed, please retry."
+        },
     }
     e_dict = ErrorDict(
         code=exc.status_code,
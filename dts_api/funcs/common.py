@@ -2,6 +2,7 @@ import re
 
 from copy import deepcopy
 from lxml.etree import Element, ElementTree, XML, _Element
+from dts_api.classes.TocIndex import TocIndex
 from dts_api.classes.Utils import nsmp
 
 
@@ -335,6 +336,18 @@ def complete_ref(*args):
     else:
         return citationtree
 
+def index_toc(*args) -> TocIndex:
+    """
+    Index the completed TOC: ref lookups are then resolved without scanning the TOC
+
+    :param args : citationtree: completed TOC, output of complete_ref
+    :return: TocIndex wrapping the TOC
+    """
+
+    citationtree: ElementTree = args[0]
+
+    return TocIndex(citationtree)
+
 def decorate(paths: list[str], prefix: str) -> list[str]:
     decorated = []
     for path in paths:
@@ -364,18 +377,6 @@ def is_param(path: str) -> bool:
     else:
         return False
 
-def set_dts_resource(namespace: str = 'http://www.tei-c.org/ns/1.0'):
-
-    base = f'<?xml version="1.0"?><DtsResource xmlns="{namespace}">' \
-           '<proc></proc>' \
-           '<CitationTrees></CitationTrees><TableOfContent></TableOfContent>' \
-           '<Document></Document></DtsResource>'
-
-    element: Element = XML(base)
-    root: ElementTree = ElementTree(element)
-
-    return root
-
 def get_siblings(siblings: list, element, origin_tag):
     next_element = element.getnext()
     if next_element is not None:
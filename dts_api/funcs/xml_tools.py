@@ -1,47 +1,41 @@
-from copy import deepcopy
+import re
 
 from fastapi import HTTPException
-from lxml.etree import ElementTree, Element
+from lxml import etree
+from lxml.etree import ElementTree, Element, _Element
 
-from dts_api.classes.Utils import nsmp
+from dts_api.classes.TocIndex import TocIndex
 from dts_api.model.NavigationModel import CitableUnit
-from dts_api.funcs.common import get_siblings
 
+NS_DECLARATION = re.compile(rb' xmlns(?::([^=]+))?="([^"]*)"')
+NS_USAGE = etree.XPath('boolean(descendant-or-self::*[namespace-uri() = $uri] | descendant-or-self::*/@*[namespace-uri() = $uri])')
 
-def pick_root(down: int, toc: ElementTree) -> list:
-    cite_unit: Element
-    prefix, namespace, nsmap = nsmp(None, 'tei')
-    path = f"./{prefix}:CitableUnit" if down == -1 else f"./{prefix}:CitableUnit[level<={down}]"
-    tmp = toc.xpath(path, namespaces={prefix: nsmap[prefix]})
-    return tmp
 
+def pick_root(down: int, toc: TocIndex) -> list:
+    return toc.roots(down)
 
-def pick_ref(ref: str, toc: ElementTree, nsmap: dict) -> Element:
-    path = f"./*[@ref='{ref}']"
-    element: Element = toc.find(path, namespaces=nsmap)
+
+def pick_ref(ref: str, toc: TocIndex) -> Element:
+    element: Element = toc.get(ref)
     if element is not None:
         return element
     else:
         raise HTTPException(status_code=404, detail=f"reference error : value '{ref}' does not exist in table of content")
 
 
-def pick_ref_siblings(element: Element, siblings, level, down=0):
-    sibling: Element
-    next_element = element.getnext()
-    while next_element is not None and next_element.get('level') != level and next_element.get('level') > level:
-        siblings.append(next_element)
-        return pick_ref_siblings(next_element, siblings, level, down)
+def pick_ref_siblings(element: Element, toc: TocIndex, level, down=0):
+    siblings = toc.descendants(element.get('ref'))
     if down == -1:
         return siblings
     else:
         return list(filter(lambda sib: int(sib.get('level')) <= int(level) + 1 + down, siblings))
 
 
-def pick_ref_parent(ref: str, toc: ElementTree, nsmap: dict):
-    element = pick_ref(ref, toc, nsmap)
+def pick_ref_parent(ref: str, toc: TocIndex):
+    element = pick_ref(ref, toc)
     parent = element.get('parent')
     if parent:
-        return pick_ref(parent, toc, nsmap)
+        return pick_ref(parent, toc)
     else:
         return None
 
@@ -52,32 +46,92 @@ def narrow_selection(member: list, start: str, end: str):
     end_index = identifiers.index(end) + 1
     return member[start_index:end_index]
 
-def term_extractor(ref: Element, nsmap):
-    terms = {}
-    citable_elements: Element = ref.findall('.//CitableData', namespaces=nsmap)
-    citable: Element
-    for citable in citable_elements:
-        citable.attrib.update({'value': citable.text})
-        term = {
-            citable.get('term'): dict(citable.attrib)
-        }
-        del term[citable.get('term')]['term']
-        terms.update(term)
-
-    return terms if len(terms) else None
-
-def populate_content(*args):
-    fragment: Element
-    document: ElementTree
-    fragment, document, nsmap = args
-    path = fragment.get('fullpath')
-    query_result: Element = document.find(path)
-    content: Element = fragment.find('content')
-
-    if not query_result.__len__():
-        siblings = get_siblings([], query_result, query_result.tag)
-        content.append(deepcopy(query_result))
-        for el in siblings:
-            content.append(el)
-    else:
-        content.append(deepcopy(query_result))
\ No newline at end of file
+def select_fragment(unit: Element, document: ElementTree) -> list[_Element]:
+    """
+    locate the source elements of a citable unit in the document, without copying them
+
+    an empty element (e.g. a milestone) is followed by its siblings, up to the next element with the same tag
+
+    :return: list of elements of the document
+    """
+    element: _Element = document.find(unit.get('fullpath'))
+    if element is None:
+        # the TOC has been built from another version of the document
+        raise HTTPException(status_code=409, detail=f"reference error : value '{unit.get('ref')}' is not found in the document, its table of content is outdated")
+    fragment = [element]
+    if not len(element):
+        sibling = element.getnext()
+        while sibling is not None and sibling.tag != element.tag:
+            fragment.append(sibling)
+            sibling = sibling.getnext()
+    return fragment
+
+def serialize_fragment(element: _Element, nsmap: dict) -> bytes:
+    """
+    serialize a source element with its tail, as a descendant of an element with the nsmap namespace scope
+    """
+    data: bytes = etree.tostring(element, encoding='UTF-8')
+    if not isinstance(element.tag, str):
+        return data
+    return strip_declarations(data, element, nsmap)
+
+def strip_declarations(data: bytes, element: _Element, nsmap: dict) -> bytes:
+    """
+    lxml declares every namespace in scope on a standalone element: keep the declarations of the serialized
+    start tag that are not in the output scope and used by the element subtree, as a copy of the element would
+
+    :param data: serialization of element, or of a childless copy of it
+    """
+    def keep(match) -> bytes:
+        prefix = match.group(1) and match.group(1).decode()
+        uri = match.group(2).decode()
+        if nsmap.get(prefix) == uri:
+            return b''
+        if prefix is not None and not NS_USAGE(element, uri=uri):
+            return b''
+        return match.group(0)
+
+    end = data.find(b'>')
+    return NS_DECLARATION.sub(keep, data[:end]) + data[end:]
+
+def iter_serialize(element: _Element, nsmap: dict, depth: int):
+    """
+    serialize a source element with its tail, piece by piece
+
+    elements are opened down to depth, deeper subtrees are serialized at once
+
+    :param nsmap: namespace scope of the output, where the element is written
+    :return: generator of bytes
+    """
+    if depth <= 0 or not len(element) or not isinstance(element.tag, str):
+        yield serialize_fragment(element, nsmap)
+        return
+
+    # childless copy of the element, split around its end tag
+    shell: _Element = Element(element.tag, element.attrib, nsmap=element.nsmap)
+    shell.text = element.text or ''
+    shell.tail = element.tail
+    data = strip_declarations(etree.tostring(shell, encoding='UTF-8'), element, nsmap)
+    local_name = etree.QName(element).localname
+    end_tag = f"</{element.prefix}:{local_name}>" if element.prefix else f"</{local_name}>"
+    position = data.rindex(end_tag.encode())
+
+    yield data[:position]
+    for child in element:
+        yield from iter_serialize(child, element.nsmap, depth - 1)
+    yield data[position:]
+
+def chunked(pieces, chunk_size: int):
+    """
+    group serialized pieces into chunks of at least chunk_size bytes, a larger piece is a chunk on its own
+    """
+    chunk: list[bytes] = []
+    size = 0
+    for piece in pieces:
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield b''.join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b''.join(chunk)
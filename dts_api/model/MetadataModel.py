@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Optional, Mapping
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, InstanceOf
 
 
 class IndexMetadataModel(BaseModel):
@@ -14,6 +14,14 @@ class IndexMetadataModel(BaseModel):
     children_count: int = 0
     citation_trees: Optional[list] = Field(default=None)
     type: str = Field(default="collection")
+    parent_id: Optional[str] = Field(default=None)
+    children_ids: list[str] = Field(default_factory=list)
+    # CitationTrees descriptors of a resource, computed on the first collection listing and shared by its entries
+    deployed_citation_trees: Optional[list] = Field(default=None, exclude=True, repr=False)
+    # stamp of the source file the descriptors were read from (see Store.get_stamp)
+    deployed_stamp: Optional[tuple] = Field(default=None, exclude=True, repr=False)
+    # read-only metadata of the entry, shared with the metadata held by the store
+    node: Optional[InstanceOf[Mapping]] = Field(default=None, exclude=True, repr=False)
 
     def model_post_init(self, __context):
         self.set_key()
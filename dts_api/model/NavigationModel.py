@@ -1,5 +1,6 @@
 import dataclasses
 
+from functools import cache
 from typing import Annotated
 from dts_api.model.ViewModel import View
 from dts_api.settings.settings import get_settings
@@ -54,24 +55,22 @@ class CitableUnit(BaseModel):
     # include parent field when the value is set to None
     # workaround : https://github.com/pydantic/pydantic/discussions/5461
     @model_serializer
-    def _serialize(self, skip=False):
+    def _serialize(self):
         serialized_model: dict = {}
-        if not skip:
-            omit_if_none_fields = {
-                k
-                for k, v in self.__class__.model_fields.items()
-                if any(isinstance(m, OmitIfNone) for m in v.metadata)
-            }
-            # return {k: v for k, v in self if k in omit_if_none_fields or v is not None}
-            for k, v in self:
-                if k in omit_if_none_fields or v is not None:
-                    k = self.__class__.model_fields[k].serialization_alias if self.__class__.model_fields[k].serialization_alias else k
-                    serialized_model[k] = v
-            return serialized_model
-        # else, return serialization by alias
-        # for k, v in self:
-        #     if self.__class__.model_fields[k].serialization_alias:
-        #         tmp[self.__class__.model_fields[k].serialization_alias] = v
-        #     else:
-        #         tmp[k] = v
-        # return tmp
+        for name, key, keep_none in serialization_fields(self.__class__):
+            value = getattr(self, name)
+            if keep_none or value is not None:
+                serialized_model[key] = value
+        return serialized_model
+
+@cache
+def serialization_fields(model: type[BaseModel]) -> tuple:
+    """
+    serialized fields of a model, computed once per model class
+
+    :return: tuple of (field name, serialized key, keep the field when None)
+    """
+    return tuple(
+        (name, field.serialization_alias or name, any(isinstance(m, OmitIfNone) for m in field.metadata))
+        for name, field in model.model_fields.items()
+    )
@@ -62,6 +62,7 @@ class DocumentParams(BaseModel):
     end: str = Field(default=None)
     tree: str = Field(default=None)
     media_type: str = Field(default="text/xml", serialization_alias="mediaType")
+    stylesheet: str = Field(default="default")
 
     @model_validator(mode='after')
     def start_end_consistency(self) -> Self:
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -17,6 +19,21 @@ class Settings(BaseSettings):
     base_path: str = None
     metadata_path: str = None
     tei_ns: str = None
+    cache_toc_bytes: int = 256 * 1024 * 1024
+    cache_document_bytes: int = 256 * 1024 * 1024
+    cache_html_bytes: int = 64 * 1024 * 1024
+    cache_wrapper_bytes: int = 16 * 1024 * 1024
+    cache_response_bytes: int = 128 * 1024 * 1024
+    cache_ttl: Optional[float] = None
+    remote_document_ttl: float = 300.0
+    toc_artifacts: bool = False
+    toc_artifacts_path: str = ".toc"
+    warmup: bool = False
+    warmup_workers: Optional[int] = None
+    watch: bool = False
+    watch_interval: float = 1.0
+    stream_chunk_size: int = 64 * 1024
+    html_stylesheets: dict[str, str] = {}
 
     model_config = SettingsConfigDict(
         env_file=".env"
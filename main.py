@@ -8,7 +8,10 @@ from fastapi.openapi.utils import get_openapi
 
 from dts_api.api.route.router import base_router
 from dts_api.classes.Cache import Cache
+from dts_api.classes.CorpusWatcher import CorpusWatcher
+from dts_api.classes.ResponseCache import ResponseCacheMiddleware
 from dts_api.classes.Store import Store
+from dts_api.commands.warmup import warmup
 from dts_api.errors.CustomError import validation_exception_handler, not_found_exception_handler, \
     connection_error_exception_handler, MetadataValidationError, md_validation_exception_handler
 from dts_api.settings.settings import settings
@@ -20,10 +23,18 @@ origins = settings.allowed_hosts
 async def lifespan(api: FastAPI):
     print("####### startup events #######")
     api.__str__()
-    Store()
+    store = Store()
     Cache()
+    if settings.warmup:
+        print(f"{warmup(store, settings.warmup_workers)} TOC(s) loaded in cache")
+    watcher = None
+    if settings.watch and settings.storage == 'local':
+        watcher = CorpusWatcher(store, settings.watch_interval)
+        watcher.start()
     print("####### end startup events #######")
     yield
+    if watcher is not None:
+        watcher.stop()
 
 app = FastAPI(
     lifespan=lifespan,
@@ -59,6 +70,7 @@ def custom_openapi():
     return app.openapi_schema
 
 app.openapi = custom_openapi
+app.add_middleware(ResponseCacheMiddleware, prefix="/api/dts/v1")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -0,0 +1,35 @@
+"""
+Serialization benchmark of a navigation response with a large member list.
+
+run from the project root: python -m tests.bench_serialization [members]
+"""
+import json
+import sys
+import timeit
+
+from dts_api.model.NavigationModel import CitableUnit, NavigationModel
+
+
+def build(members: int) -> NavigationModel:
+    return NavigationModel(id='bench', member=[
+        CitableUnit(identifier=f'{i}', level=1 + i % 3, parent=None if i % 3 == 0 else f'{i - i % 3}', cite_type='verse',
+                    dublin_core={'title': {'value': f'verse {i}'}} if i % 2 else None)
+        for i in range(members)
+    ])
+
+def dict_path(model: NavigationModel) -> bytes:
+    # previous path: dict dump, then encoded by the JSONResponse
+    content = model.model_dump(by_alias=True, exclude_none=True, exclude_defaults=False)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def json_path(model: NavigationModel) -> bytes:
+    return model.model_dump_json(by_alias=True, exclude_none=True, exclude_defaults=False).encode("utf-8")
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    model = build(size)
+    assert dict_path(model) == json_path(model)
+    for name, path in (('model_dump + json.dumps', dict_path), ('model_dump_json', json_path)):
+        best = min(timeit.repeat(lambda: path(model), number=5, repeat=5)) / 5
+        print(f"{name:<24} {size} members: {best * 1000:.1f} ms")
@@ -0,0 +1,51 @@
+"""
+TOC building benchmark on the tests/dummy corpus: recursive pipeline against the single pass engine.
+
+run from the project root: python -m tests.bench_toc [repeat]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+from lxml import etree
+
+from dts_api.classes.FileStorage import LocalFileStorage
+from dts_api.classes.Pipeline import TocPipelineBuilder
+from dts_api.classes.Utils import nsmp
+
+DATABASE = Path(__file__).parent / 'dummy' / 'local-storage-data' / 'database'
+
+
+def citation_trees(cite_structure) -> list[dict]:
+    prefix, namespace, nsmap = nsmp()
+    trees = cite_structure.findall(f"{namespace}citeStructure")
+    # the index metadata names the trees, the first one is the default tree
+    return [{'name': 'default' if position == 0 else f'tree-{position}', 'position': position} for position in range(len(trees))]
+
+def pipeline_path(builder: TocPipelineBuilder, document, cite_metadata, cite_structure, tree: str, nsmap: dict):
+    # previous path: the pipeline tags copies of the document and of the refsDecl
+    return builder.get_pipeline()(document, cite_metadata, cite_structure, tree, nsmap)
+
+def engine_path(builder: TocPipelineBuilder, document, cite_metadata, cite_structure, tree: str, nsmap: dict):
+    return builder.build_toc(document, cite_metadata, cite_structure, tree, nsmap)
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    builder = TocPipelineBuilder()
+    nsmap = nsmp()[2]
+    totals = {'pipeline': 0.0, 'engine': 0.0}
+    for source in sorted(DATABASE.rglob('*.xml')):
+        document, cite_structure = LocalFileStorage.parse_document(source)
+        cite_metadata = citation_trees(cite_structure)
+        for tree in cite_metadata:
+            args = (builder, document, cite_metadata, cite_structure, tree['name'], nsmap)
+            old, new = pipeline_path(*args), engine_path(*args)
+            assert etree.tostring(old.toc) == etree.tostring(new.toc), f"{source.name} {tree['name']}"
+            timings = {}
+            for name, path in (('pipeline', pipeline_path), ('engine', engine_path)):
+                timings[name] = min(timeit.repeat(lambda: path(*args), number=1, repeat=repeat))
+                totals[name] += timings[name]
+            print(f"{source.name:<36} {tree['name']:<10} {len(new):>5} units: "
+                  f"pipeline {timings['pipeline'] * 1000:.1f} ms, engine {timings['engine'] * 1000:.1f} ms")
+    print(f"{'total':<47} {'':>5}        pipeline {totals['pipeline'] * 1000:.1f} ms, engine {totals['engine'] * 1000:.1f} ms")
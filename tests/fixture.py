@@ -29,6 +29,8 @@ class LocalSettings(BaseSettings):
     metadata_path: str = None
     tei_ns: str = None
     testing: bool = None
+    toc_artifacts: bool = False
+    toc_artifacts_path: str = ".toc"
     model_config = SettingsConfigDict(
         env_file="tests/dummy/.env.local"
     )
@@ -57,6 +59,8 @@ class GithubSettings(BaseSettings):
     base_path: str = None
     metadata_path: str = None
     tei_ns: str = None
+    toc_artifacts: bool = False
+    toc_artifacts_path: str = ".toc"
     model_config = SettingsConfigDict(
         env_file="tests/dummy/.env.github"
     )
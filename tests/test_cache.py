@@ -0,0 +1,52 @@
+import time
+
+from dts_api.classes.Cache import Cache, CacheNamespace
+from .fixture import client, store_settings_fixture
+
+
+def test_cache_namespace_evicts_least_recently_used_entries():
+    cache = CacheNamespace('test', max_bytes=30)
+    cache.set('a', 'a', size=10)
+    cache.set('b', 'b', size=10)
+    cache.set('c', 'c', size=10)
+    assert cache.get('a') == 'a'  # 'b' becomes the least recently used entry
+    cache.set('d', 'd', size=10)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'a' and cache.get('c') == 'c' and cache.get('d') == 'd'
+    stats = cache.stats()
+    assert stats['bytes'] == 30
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 4 and stats['misses'] == 1
+
+def test_cache_namespace_expires_and_validates_versions():
+    cache = CacheNamespace('test', max_bytes=100, ttl=0.01)
+    cache.set('a', 'a', size=1, version=1)
+    assert cache.get('a', version=2) is None
+    assert 'a' not in cache
+
+    cache.set('b', 'b', size=1)
+    time.sleep(0.02)
+    assert cache.get('b') is None
+    assert cache.stats()['expirations'] == 1
+
+    # an entry can have its own time to live
+    cache.set('c', 'c', size=1, ttl=60)
+    time.sleep(0.02)
+    assert cache.get('c') == 'c'
+
+def test_cache_stats_endpoint(client, store_settings):
+    client.get("/api/dts/v1/navigation?resource=short-document")
+    response = client.get("/api/dts/v1/cache_stats")
+    assert response.status_code == 200
+    assert set(response.json().keys()) == {'toc', 'document', 'html', 'wrapper', 'response'}
+    assert response.json()['toc']['entries'] >= 1
+
+def test_toc_cache_keeps_one_entry_per_citation_tree(client, store_settings):
+    client.get("/api/dts/v1/navigation?resource=short-document&down=-1")
+    client.get("/api/dts/v1/navigation?resource=short-document&tree=postface&down=-1")
+    client.get("/api/dts/v1/navigation?resource=short-document&down=-1")
+
+    toc_keys = Cache().namespace('toc').keys()
+    assert ('short-document', 'default') in toc_keys
+    assert ('short-document', 'postface') in toc_keys
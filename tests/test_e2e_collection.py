@@ -1,3 +1,4 @@
+from dts_api.model.CollectionModel import SubCollectionResource
 from .fixture import client, store_settings_fixture
 
 def test_collection_get_endpoint_returns_200_with_valid_query(client, store_settings):
@@ -66,4 +67,16 @@ def test_collection_get_returned_representation(client, store_settings):
         'view'
     ]
     response_fields = list(response.json().keys())
-    assert response_fields == expected_properties
\ No newline at end of file
+    assert response_fields == expected_properties
+
+def test_collection_builds_only_the_members_of_the_page(client, store_settings, monkeypatch):
+    built = []
+    post_init = SubCollectionResource.model_post_init
+    monkeypatch.setattr(SubCollectionResource, 'model_post_init', lambda self, context: built.append(self.id) or post_init(self, context))
+
+    response = client.get("/api/dts/v1/collection?id=1-1&limit=2&page=2")
+    content = response.json()
+    assert [member['@id'] for member in content['member']] == built
+    assert len(built) == 2
+    assert content['totalChildren'] == 5
+    assert 'page=2' in content['view']['@id']
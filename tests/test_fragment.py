@@ -0,0 +1,96 @@
+from copy import deepcopy
+from pathlib import Path
+
+from lxml import etree
+
+from dts_api.classes.Cache import Cache
+from dts_api.classes.Designer import XmlDesigner
+from dts_api.classes.DtsResource import DtsResource
+from dts_api.classes.Pipeline import TocPipelineBuilder
+from dts_api.classes.Store import Store
+from dts_api.classes.Utils import nsmp
+from dts_api.funcs.xml_tools import select_fragment, chunked
+from .fixture import store_settings_fixture
+
+
+def test_fragments_are_serialized_from_the_source_document(store_settings, monkeypatch):
+    prefix, namespace, nsmap = nsmp()
+    store = Store()
+    item = store.get_index_entry('short-document')[0]
+    document, cite_metadata, cite_structure = store.get_document(item)
+    toc = TocPipelineBuilder().build_toc(document, cite_metadata, cite_structure, 'default', nsmap)
+    before = etree.tostring(document)
+
+    fragment = select_fragment(toc.get('Jean 1'), document)
+    assert fragment[0] is document.find(toc.get('Jean 1').get('fullpath'))
+
+    # the designer reads its template relatively to the project root
+    monkeypatch.chdir(Path(__file__).parent.parent)
+    resource = DtsResource('short-document', document, cite_structure, toc.toc, namespace)
+    first = XmlDesigner.design_subsection([fragment], resource, nsmap)
+    second = XmlDesigner.design_subsection([fragment], resource, nsmap)
+    assert first == second
+    assert etree.tostring(document) == before
+
+    wrapper = etree.fromstring(first).find('.//{https://w3id.org/dts/api#}wrapper')
+    assert [element.get('n') for element in wrapper] == [element.get('n') for element in fragment]
+    assert wrapper[0].tag == f"{namespace}div"
+    assert toc.get('Jean 1').find('content') is not None and not len(toc.get('Jean 1').find('content'))
+
+def test_fragment_wrapper_is_built_once_per_document(store_settings, monkeypatch):
+    prefix, namespace, nsmap = nsmp()
+    store = Store()
+    item = store.get_index_entry('short-document')[0]
+    document, cite_metadata, cite_structure = store.get_document(item)
+    toc = TocPipelineBuilder().build_toc(document, cite_metadata, cite_structure, 'default', nsmap)
+    fragment = select_fragment(toc.get('Jean 1'), document)
+    monkeypatch.chdir(Path(__file__).parent.parent)
+    cache = Cache().namespace('wrapper')
+    cache.clear()
+
+    resource = DtsResource('short-document', document, cite_structure, toc.toc, namespace, version=store.get_stamp(item))
+    first = XmlDesigner.design_subsection([fragment], resource, nsmap)
+    hits = cache.stats()['hits']
+    assert XmlDesigner.design_subsection([fragment], resource, nsmap) == first
+    assert cache.stats()['hits'] == hits + 1
+    header = etree.fromstring(first).find(f'{namespace}teiHeader')
+    assert etree.tostring(header) == etree.tostring(resource.header)
+
+    # an edited file is another version of the resource, the entry does not hold the document
+    mtime, size = store.get_stamp(item)
+    edited = DtsResource('short-document', deepcopy(document), cite_structure, toc.toc, namespace, version=(mtime + 1, size))
+    XmlDesigner.design_subsection([fragment], edited, nsmap)
+    assert cache.stats()['hits'] == hits + 1
+    assert all(isinstance(version, tuple) for _, _, version, _ in cache.entries.values())
+
+SAMPLE = b'''<?xml version="1.0" encoding="UTF-8"?>
+<?xml-model href="tei_all.rng"?>
+<TEI xmlns="http://www.tei-c.org/ns/1.0" xmlns:xi="http://www.w3.org/2001/XInclude" n="root">
+  <teiHeader><title>A &amp; B</title></teiHeader>
+  <text>
+    <body>
+      <!-- comment -->
+      <div n="1" rend="a&quot;b">caf\xc3\xa9 <pb n="1"/> &lt;text&gt;<xi:include href="x.xml"><xi:fallback/></xi:include></div>
+      <div n="2"><p>tail</p>after</div>
+    </body>
+  </text>
+</TEI>'''
+
+def test_streamed_document_matches_the_tree_serialization(monkeypatch):
+    prefix, namespace, nsmap = nsmp()
+    document = etree.ElementTree(etree.fromstring(SAMPLE))
+    resource = DtsResource('sample', document, None, None, namespace)
+
+    # reference: the TEI root rebuilt from copies of the document, serialized at once
+    root = etree.Element("TEI", nsmap=nsmap)
+    for pi in resource.proc:
+        root.addprevious(deepcopy(pi))
+    root.extend(deepcopy(child) for child in document.getroot())
+    expected = etree.tostring(etree.ElementTree(root), encoding='UTF-8', pretty_print=True, xml_declaration=True)
+
+    for depth in range(5):
+        monkeypatch.setattr(XmlDesigner, 'stream_depth', depth)
+        pieces = list(XmlDesigner.design_root(resource.root, resource, nsmap))
+        assert b''.join(pieces) == expected
+        assert b''.join(chunked(pieces, 16)) == expected
+        assert all(len(chunk) >= 16 for chunk in list(chunked(pieces, 16))[:-1])
@@ -0,0 +1,36 @@
+from dts_api.classes.Store import Store
+from .fixture import client, store_settings_fixture
+
+
+def test_index_lookup_matches_index_scan(store_settings):
+    store = Store()
+    for entry_id in {entry.id for entry in store.index}:
+        entries = [entry for entry in store.index if entry.id == entry_id]
+        assert store.get_index_entry(entry_id) == entries
+        assert store.get_index_count(entry_id) == len([entry for entry in entries if entry.depth])
+        assert store.get_index_children_count(entry_id) == sum(entry.children_count for entry in entries)
+
+    assert store.get_index_entry('unknown') == []
+    assert store.get_index_count('unknown') == 0
+
+def test_index_lookup_returns_a_new_list(store_settings):
+    store = Store()
+    entry_id = store.index[-1].id
+    store.get_index_entry(entry_id).pop()
+    assert len(store.get_index_entry(entry_id)) >= 1
+
+def test_index_entries_carry_adjacency(store_settings):
+    store = Store()
+    root = store.get_index_entry('1')[0]
+    assert root.parent_id is None
+    assert root.children_ids == [child['id'] for child in root.node['children']]
+    for child_id in root.children_ids:
+        assert all(entry.parent_id == '1' for entry in store.get_index_entry(child_id) if entry.path.startswith(root.path))
+    assert root.node is store.get_index_entry('1')[0].node
+
+def test_collection_members_follow_the_child_ids(client, store_settings):
+    store = Store()
+    for collection_id in ['1', '1-1']:
+        entry = store.get_index_entry(collection_id)[0]
+        members = client.get(f"/api/dts/v1/collection?id={collection_id}&limit=100").json()['member']
+        assert [member['@id'] for member in members] == entry.children_ids
@@ -0,0 +1,38 @@
+import shutil
+
+from dts_api.classes.Cache import Cache
+from dts_api.classes.Store import Store
+from .fixture import LocalSettings, client, store_settings_fixture
+
+
+def test_reload_swaps_the_index_and_keeps_unchanged_entries(client, store_settings, monkeypatch, tmp_path):
+    shutil.copytree(LocalSettings().base_path, tmp_path / 'database')
+    store = Store()
+    metadata = tmp_path / 'database' / store.fs.metadata_path
+    monkeypatch.setattr(store.fs, 'full_path', metadata)
+    Cache().clear()
+
+    try:
+        url = "/api/dts/v1/collection?id=short-document"
+        first = client.get(url)
+        client.get("/api/dts/v1/navigation?resource=short-document&down=1")
+        client.get("/api/dts/v1/navigation?resource=st-augustin-confessions&down=1")
+        other = Cache().namespace('toc').get(('st-augustin-confessions', 'default'))
+        assert client.get("/api/dts/v1/reload_index").json()['changed'] == []
+        version = store.version
+
+        metadata.write_text(metadata.read_text().replace('"title": "The Project Gutenberg eBook of Short Document Stoy"', '"title": "Short Document"'))
+        changed = client.get("/api/dts/v1/reload_index").json()['changed']
+        # the collections holding the resource change with it
+        assert 'short-document' in changed and '1-1' in changed
+        assert 'st-augustin-confessions' not in changed
+        assert store.version != version
+
+        assert ('short-document', 'default') not in Cache().namespace('toc')
+        assert Cache().namespace('toc').get(('st-augustin-confessions', 'default')) is other
+        second = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        assert second.status_code == 200
+        assert second.json()['title'] == 'Short Document'
+    finally:
+        monkeypatch.undo()
+        store.reload()
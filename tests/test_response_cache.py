@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+
+from dts_api.classes.Cache import Cache
+from dts_api.classes.ResponseCache import ResponseCacheMiddleware
+from dts_api.classes.Store import Store
+from .fixture import client, store_settings_fixture
+
+
+def test_responses_are_cached_with_an_etag(client, store_settings):
+    Cache().namespace('response').clear()
+    url = "/api/dts/v1/navigation?resource=short-document&down=-1"
+    first = client.get(url)
+    etag = first.headers['ETag']
+    hits = Cache().namespace('response').stats()['hits']
+
+    # the query parameters are normalized, their order does not matter
+    second = client.get("/api/dts/v1/navigation/?down=-1&resource=short-document")
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers['ETag'] == etag
+    assert Cache().namespace('response').stats()['hits'] == hits + 1
+
+    not_modified = client.get(url, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not not_modified.content
+
+def test_streamed_documents_and_errors(client, store_settings):
+    Cache().namespace('response').clear()
+    url = "/api/dts/v1/document?resource=st-augustin-confessions&media_type=text/xml"
+    first = client.get(url)
+    assert client.get(url).content == first.content
+    assert client.get(url, headers={'If-None-Match': 'W/"other", ' + first.headers['ETag']}).status_code == 304
+
+    assert client.get("/api/dts/v1/document?resource=foo_text&media_type=text/xml").status_code == 404
+    assert 'ETag' not in client.get("/api/dts/v1/document?resource=foo_text&media_type=text/xml").headers
+
+def test_etags_follow_the_source_files_and_the_resets(client, store_settings):
+    store = Store()
+    source = Path(store.fs.base_path) / store.get_index_entry('short-document')[0].location
+    stat = source.stat()
+    url = "/api/dts/v1/navigation?resource=short-document&down=1"
+    etag = client.get(url).headers['ETag']
+    collection_etag = client.get("/api/dts/v1/collection?id=1-1").headers['ETag']
+
+    # a revalidation after an eviction needs no rendering
+    Cache().namespace('response').clear()
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    assert not len(Cache().namespace('response'))
+
+    try:
+        # an edited file changes the ETags of the resource and of the collections listing it
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+        assert client.get("/api/dts/v1/collection?id=1-1").headers['ETag'] != collection_etag
+    finally:
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    etag = client.get(url).headers['ETag']
+    client.get("/api/dts/v1/reset_cache")
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+def test_collection_etags_need_no_stat_of_the_members(client, store_settings, monkeypatch):
+    store = Store()
+    stamps = []
+    stamp = store.fs.stamp
+    monkeypatch.setattr(store.fs, 'stamp', lambda index: stamps.append(index.id) or stamp(index))
+    url = "/api/dts/v1/collection?id=1-1"
+    etag = client.get(url).headers['ETag']
+    stamps.clear()
+
+    assert client.get(url).headers['ETag'] == etag
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    assert not stamps
+
+def test_any_etag_matches_existing_entries_only(client, store_settings):
+    assert client.get("/api/dts/v1/navigation?resource=short-document&down=1", headers={'If-None-Match': '*'}).status_code == 304
+    assert client.get("/api/dts/v1/navigation?resource=foo_text&down=1", headers={'If-None-Match': '*'}).status_code != 304
+
+def test_large_bodies_are_not_cached(client, store_settings, monkeypatch):
+    cache = Cache().namespace('response')
+    cache.clear()
+    url = "/api/dts/v1/document?resource=st-augustin-confessions&media_type=text/xml"
+    size = len(client.get(url).content)
+    assert len(cache) == 1
+
+    # a body over the entry limit is streamed without being kept
+    cache.clear()
+    monkeypatch.setattr(cache, 'max_bytes', size * ResponseCacheMiddleware.max_entry_ratio - 1)
+    assert len(client.get(url).content) == size
+    assert not len(cache)
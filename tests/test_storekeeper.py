@@ -0,0 +1,181 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from lxml import etree
+
+from dts_api.classes import FileStorage
+from dts_api.classes.Cache import Cache, CacheNamespace
+from dts_api.classes.Designer import HtmlDesigner, XmlDesigner
+from dts_api.classes.DtsResource import DtsResource
+from dts_api.classes.FileStorage import GithubFileStorage, LocalFileStorage, parse_cite_structure
+from dts_api.classes.Store import Store
+from dts_api.classes.TocIndex import TocIndex
+from dts_api.classes.Utils import nsmp
+from .fixture import LocalSettings, client, store_settings_fixture
+
+
+def count_calls(monkeypatch, owner, name: str, static: bool = False) -> list:
+    calls = []
+    original = getattr(owner, name)
+
+    def counter(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(owner, name, staticmethod(counter) if static else counter)
+    return calls
+
+def test_cold_request_parses_document_once(client, store_settings, monkeypatch):
+    Cache().clear()
+    parses = count_calls(monkeypatch, LocalFileStorage, 'parse_document', static=True)
+    loads = count_calls(monkeypatch, Store(), 'get_document')
+
+    response = client.get("/api/dts/v1/navigation?resource=st-augustin-confessions&down=1")
+    assert response.status_code == 200
+    assert len(parses) == 1
+    assert len(loads) == 1
+
+    # a second citation tree reuses the parsed document, a document request gets it from the document cache
+    client.get("/api/dts/v1/navigation?resource=short-document&down=1")
+    client.get("/api/dts/v1/navigation?resource=short-document&tree=postface&down=1")
+    client.get("/api/dts/v1/document?resource=short-document")
+    assert len(parses) == 2
+    assert len(loads) == 4
+    # the TOC cache does not keep documents alive, they are bounded by the document cache budget
+    assert isinstance(Cache().namespace('toc').get(('short-document', 'default')), TocIndex)
+
+def test_collection_pages_share_the_store_metadata(client, store_settings, monkeypatch):
+    store = Store()
+    reads = count_calls(monkeypatch, store.fs, 'open_document')
+
+    for query in ['?id=1', '?id=1-1&page=1&limit=2', '?id=1-1&page=2&limit=2', '?id=short-document&nav=parents']:
+        assert client.get(f"/api/dts/v1/collection{query}").status_code == 200
+    # the metadata file is never read again
+    assert not [args for args in reads if not args]
+
+    # the metadata is read-only, requests work on copies
+    with pytest.raises(TypeError):
+        store.get_document()['id'] = 'changed'
+
+def test_collection_listing_reads_only_the_headers(client, store_settings, monkeypatch):
+    Cache().clear()
+    store = Store()
+    for entry in store.index:
+        entry.deployed_citation_trees = None
+    parses = count_calls(monkeypatch, LocalFileStorage, 'parse_document', static=True)
+    headers = count_calls(monkeypatch, store, 'get_cite_structure')
+
+    first = client.get("/api/dts/v1/collection?id=1-1").json()
+    assert not parses
+    assert len(headers) == 5
+    Cache().clear()
+    assert client.get("/api/dts/v1/collection?id=1-1").json() == first
+    assert len(headers) == 5
+
+    item = store.get_index_entry('short-document')[0]
+    assert etree.tostring(parse_cite_structure(f"{store.fs.base_path}/{item.location}")) == etree.tostring(store.get_document(item)[2])
+
+def test_collection_listing_follows_the_edited_headers(client, store_settings, monkeypatch, tmp_path):
+    shutil.copytree(LocalSettings().base_path, tmp_path / 'database')
+    store = Store()
+    monkeypatch.setattr(store.fs, 'base_path', str(tmp_path / 'database'))
+    Cache().clear()
+    for entry in store.index:
+        entry.deployed_citation_trees = None
+
+    url = "/api/dts/v1/collection?id=1-1"
+    assert 'chapter' in client.get(url).text
+    source = tmp_path / 'database' / store.get_index_entry('short-document')[0].location
+    source.write_bytes(source.read_bytes().replace(b'unit="chapter"', b'unit="section"'))
+
+    # neither a watcher nor a reset: a request of the resource sees its new stamp and bumps its collections,
+    # whose listing reads the descriptors again
+    client.get("/api/dts/v1/navigation?resource=short-document&down=1")
+    edited = client.get(url).text
+    assert 'section' in edited and 'chapter' not in edited
+
+    # without a stamp (remote storage), a reset reads the headers again
+    monkeypatch.setattr(store, 'get_stamp', lambda document_id: None)
+    client.get(url)
+    source.write_bytes(source.read_bytes().replace(b'unit="section"', b'unit="chapter"'))
+    client.get("/api/dts/v1/reset_cache")
+    assert 'chapter' in client.get(url).text
+
+    monkeypatch.undo()
+    Cache().clear()
+    for entry in store.index:
+        entry.deployed_citation_trees = None
+
+def test_edited_file_gets_a_new_toc(client, store_settings, monkeypatch, tmp_path):
+    shutil.copytree(LocalSettings().base_path, tmp_path / 'database')
+    store = Store()
+    monkeypatch.setattr(store.fs, 'base_path', str(tmp_path / 'database'))
+    Cache().clear()
+
+    assert client.get("/api/dts/v1/document?resource=short-document&ref=Matthieu").status_code == 200
+    source = tmp_path / 'database' / store.get_index_entry('short-document')[0].location
+    source.write_bytes(source.read_bytes().replace(b'<div n="Matthieu">', b'<div n="Marc">'))
+
+    # no watcher: the TOC is stamped as the document it is paired with
+    response = client.get("/api/dts/v1/document?resource=short-document&ref=Marc")
+    assert response.status_code == 200
+    assert 'Saint-Matthieu' in response.text
+    assert client.get("/api/dts/v1/document?resource=short-document&ref=Matthieu").status_code != 200
+
+def test_outdated_toc_is_dropped(client, store_settings, monkeypatch, tmp_path):
+    shutil.copytree(LocalSettings().base_path, tmp_path / 'database')
+    store = Store()
+    monkeypatch.setattr(store.fs, 'base_path', str(tmp_path / 'database'))
+    # a storage that cannot stamp its files
+    monkeypatch.setattr(store, 'get_stamp', lambda document_id: None)
+    Cache().clear()
+
+    url = "/api/dts/v1/document?resource=short-document&ref=Jean"
+    assert client.get(url).status_code == 200
+    source = tmp_path / 'database' / store.get_index_entry('short-document')[0].location
+    data = source.read_bytes()
+    source.write_bytes(data[:data.index(b'<div n="Matthieu">')] + data[data.index(b'<div n="Jean">'):])
+    Cache().namespace('response').clear()
+
+    assert client.get(url).json()['error']['code'] == 409
+    assert not [key for key in Cache().namespace('toc').keys() if key[0] == 'short-document']
+    assert client.get(url).status_code == 200
+
+def test_remote_downloads_are_kept_until_they_expire(store_settings, monkeypatch):
+    downloads = count_calls(monkeypatch, FileStorage, 'urlopen')
+    base_path = Path(LocalSettings().base_path).resolve().as_uri() + '/'
+    storage = GithubFileStorage(base_path, 'metadata.json', cache=CacheNamespace('document', 1024 * 1024), ttl=60)
+    item = Store().get_index_entry('short-document')[0]
+
+    # the header is downloaded once, the document once, then its refsDecl is read from the parsed document
+    cite_structure = storage.open_cite_structure(item)
+    assert storage.open_cite_structure(item) is cite_structure
+    document = storage.open_document(item)[0]
+    assert storage.open_document(item)[0] is document
+    assert storage.open_cite_structure(item) is storage.open_document(item)[2]
+    assert len(downloads) == 2
+
+    storage.ttl = 0
+    storage.cache.clear()
+    storage.open_document(item)
+    storage.open_document(item)
+    assert len(downloads) == 4
+
+def test_requests_leave_the_cached_document_untouched(client, store_settings, monkeypatch):
+    Cache().clear()
+    store = Store()
+    item = store.get_index_entry('short-document')[0]
+    document, cite_metadata, cite_structure = store.get_document(item)
+    before = etree.tostring(document)
+
+    client.get("/api/dts/v1/navigation?resource=short-document&down=-1")
+    toc = Cache().namespace('toc').get(('short-document', 'default'))
+    resource = DtsResource('short-document', document, cite_structure, toc.toc, nsmp()[1])
+    # designers read their stylesheets and templates relatively to the project root
+    monkeypatch.chdir(Path(__file__).parent.parent)
+    HtmlDesigner.design_root(resource.root, resource, nsmp()[2])
+    XmlDesigner.design_root(resource.root, resource, nsmp()[2])
+
+    assert store.get_document(item)[0] is document
+    assert etree.tostring(document) == before
@@ -0,0 +1,43 @@
+from lxml.etree import Element, ElementTree, SubElement
+
+from dts_api.classes.TocIndex import TocIndex
+
+
+def build_toc(units: list[tuple[str, int, str | None]]) -> ElementTree:
+    root = Element('CitationTree', tree='default')
+    for ref, level, parent in units:
+        unit = SubElement(root, 'CitableUnit', ref=ref, level=str(level))
+        if parent:
+            unit.set('parent', parent)
+    return ElementTree(root)
+
+def test_toc_index_resolves_refs_parents_and_descendants():
+    index = TocIndex(build_toc([
+        ('1', 1, None), ('1.1', 2, '1'), ('1.1.1', 3, '1.1'), ('1.2', 2, '1'),
+        ('2', 1, None), ('2.1', 2, '2'),
+    ]))
+
+    assert len(index) == 6
+    assert index.position('1.2') == 3
+    assert index.level('1.1.1') == 3
+    assert index.get('nope') is None
+    assert index.parent('1.1.1').get('ref') == '1.1'
+    assert index.parent('2') is None
+    assert [unit.get('ref') for unit in index.descendants('1')] == ['1.1', '1.1.1', '1.2']
+    assert [unit.get('ref') for unit in index.descendants('1.1')] == ['1.1.1']
+    assert index.descendants('2.1') == []
+    assert [unit.get('ref') for unit in index.roots(1)] == ['1', '2']
+    assert len(index.roots(-1)) == 6
+
+def test_toc_index_rows_carry_the_member_fields():
+    toc = build_toc([('1', 1, None), ('1.1', 2, '1')])
+    unit = toc.getroot()[1]
+    unit.set('unit', 'verse')
+    data = SubElement(SubElement(unit, '{http://www.tei-c.org/ns/1.0}DublinCore'), '{http://www.tei-c.org/ns/1.0}CitableData', term='title')
+    data.text = 'verse 1'
+    index = TocIndex(toc)
+
+    assert index.row('1') == ('1', 1, None, None, None)
+    assert index.row('1.1') == ('1.1', 2, '1', 'verse', {'title': {'value': 'verse 1'}})
+    assert index.rows_of(index.descendants('1')) == [index.row('1.1')]
+    assert data.get('value') is None
@@ -0,0 +1,101 @@
+import os
+import shutil
+
+from lxml import etree
+
+from dts_api.classes.Cache import Cache
+from dts_api.classes.FileStorage import LocalFileStorage
+from dts_api.classes.Pipeline import TocPipelineBuilder
+from dts_api.classes.Store import Store
+from dts_api.classes.TocStore import TocStore
+from dts_api.classes.Utils import nsmp
+from dts_api.commands.build_toc import build_artifacts
+from .fixture import LocalSettings, client, store_settings_fixture
+from .test_storekeeper import count_calls
+
+
+def test_build_artifacts_round_trip(store_settings, tmp_path):
+    store = Store()
+    toc_store = TocStore(LocalSettings().base_path, str(tmp_path))
+
+    assert build_artifacts(store, toc_store, report=lambda message: None) > 0
+    # artifacts are up to date, a second build skips everything
+    assert build_artifacts(store, toc_store, report=lambda message: None) == 0
+
+    item = store.get_index_entry('short-document').pop()
+    document, cite_metadata, cite_structure = store.get_document(item)
+    built = TocPipelineBuilder().build_toc(document, cite_metadata, cite_structure, 'default', nsmp()[2])
+    loaded = toc_store.load(item, 'default')
+    assert len(loaded) == len(built)
+    assert [dict(unit.attrib) for unit in loaded.units] == [dict(unit.attrib) for unit in built.units]
+
+def test_artifact_is_stale_when_source_changes(store_settings, tmp_path):
+    store = Store()
+    item = store.get_index_entry('short-document').pop()
+    source = tmp_path / item.location
+    source.parent.mkdir(parents=True)
+    shutil.copy(f"{LocalSettings().base_path}/{item.location}", source)
+
+    toc_store = TocStore(str(tmp_path), '.toc')
+    document, cite_metadata, cite_structure = store.get_document(item)
+    toc = TocPipelineBuilder().build_toc(document, cite_metadata, cite_structure, 'default', nsmp()[2])
+    toc_store.save(item, 'default', toc)
+    assert not toc_store.is_stale(item, 'default')
+
+    source.write_bytes(source.read_bytes().replace(b'</TEI>', b'</TEI>\n'))
+    assert toc_store.is_stale(item, 'default')
+    assert toc_store.load(item, 'default') is None
+
+def test_touched_source_is_hashed_once(store_settings, monkeypatch, tmp_path):
+    store = Store()
+    item = store.get_index_entry('short-document').pop()
+    source = tmp_path / item.location
+    source.parent.mkdir(parents=True)
+    shutil.copy(f"{LocalSettings().base_path}/{item.location}", source)
+
+    toc_store = TocStore(str(tmp_path), '.toc')
+    stamp = toc_store.source_stamp(item)
+    document, cite_metadata, cite_structure = store.get_document(item)
+    toc = TocPipelineBuilder().build_toc(document, cite_metadata, cite_structure, 'default', nsmp()[2])
+    toc_store.save(item, 'default', toc, stamp)
+
+    hashes = count_calls(monkeypatch, TocStore, 'source_hash', static=True)
+    os.utime(source, ns=(stamp[0] + 1_000_000_000, stamp[0] + 1_000_000_000))
+    assert not toc_store.is_stale(item, 'default')
+    loaded = toc_store.load(item, 'default')
+    assert [dict(unit.attrib) for unit in loaded.units] == [dict(unit.attrib) for unit in toc.units]
+    assert len(hashes) == 1
+
+    # an edit after the document was read leaves the artifact unwritten
+    toc_store.artifact_path(item, 'default').unlink()
+    stamp = toc_store.source_stamp(item)
+    source.write_bytes(source.read_bytes().replace(b'</TEI>', b'</TEI>\n'))
+    toc_store.save(item, 'default', toc, stamp)
+    assert not toc_store.artifact_path(item, 'default').exists()
+
+def test_single_pass_toc_matches_the_pipeline(store_settings):
+    store = Store()
+    builder = TocPipelineBuilder()
+    for item in [entry for entry in store.index if entry.type.lower() == 'resource']:
+        document, cite_metadata, cite_structure = store.get_document(item)
+        before = etree.tostring(document)
+        for tree in item.citation_trees:
+            built = builder.build_toc(document, cite_metadata, cite_structure, tree['name'], nsmp()[2])
+            expected = builder.get_pipeline()(document, cite_metadata, cite_structure, tree['name'], nsmp()[2])
+            assert etree.tostring(built.toc) == etree.tostring(expected.toc)
+        # neither path writes into the shared document
+        assert etree.tostring(document) == before
+
+def test_fresh_artifact_spares_the_document_parse(client, store_settings, monkeypatch, tmp_path):
+    store = Store()
+    toc_store = TocStore(LocalSettings().base_path, str(tmp_path))
+    build_artifacts(store, toc_store, report=lambda message: None)
+    monkeypatch.setattr(store, 'toc_store', toc_store)
+    Cache().clear()
+    parses = count_calls(monkeypatch, LocalFileStorage, 'parse_document', static=True)
+
+    # navigation reads the artifact and the header only, a document request parses the file
+    assert client.get("/api/dts/v1/navigation?resource=short-document&down=1").status_code == 200
+    assert not parses
+    assert client.get("/api/dts/v1/document?resource=short-document&ref=Matthieu").status_code == 200
+    assert len(parses) == 1
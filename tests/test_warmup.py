@@ -0,0 +1,26 @@
+from dts_api.classes.Cache import Cache
+from dts_api.classes.StoreKeeper import CommonStoreKeeper
+from dts_api.classes.Store import Store
+from dts_api.commands.warmup import warmup
+from .fixture import client, store_settings_fixture
+from .test_storekeeper import count_calls
+
+
+def test_warmup_loads_every_toc_in_cache(client, store_settings, monkeypatch):
+    Cache().clear()
+    reports = []
+    loaded = warmup(Store(), workers=2, report=reports.append)
+
+    toc_keys = Cache().namespace('toc').keys()
+    assert loaded == len(toc_keys) > 0
+    assert ('short-document', 'default') in toc_keys
+    assert ('short-document', 'postface') in toc_keys
+    assert not any('failed' in report for report in reports)
+    # documents are parsed in the workers only
+    assert len(Cache().namespace('document')) == 0
+
+    # warm requests never run the TOC pipeline
+    builds = count_calls(monkeypatch, CommonStoreKeeper, 'build_toc')
+    response = client.get("/api/dts/v1/navigation?resource=short-document&tree=postface&down=1")
+    assert response.status_code == 200
+    assert len(builds) == 0
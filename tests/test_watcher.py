@@ -0,0 +1,36 @@
+import shutil
+
+from dts_api.classes.Cache import Cache
+from dts_api.classes.CorpusWatcher import CorpusWatcher
+from dts_api.classes.Store import Store
+from .fixture import LocalSettings, client, store_settings_fixture
+
+
+def test_edited_file_refreshes_only_its_resource(client, store_settings, monkeypatch, tmp_path):
+    shutil.copytree(LocalSettings().base_path, tmp_path / 'database')
+    store = Store()
+    monkeypatch.setattr(store.fs, 'base_path', str(tmp_path / 'database'))
+    Cache().clear()
+
+    url = "/api/dts/v1/navigation?resource=short-document&down=1"
+    first = client.get(url)
+    client.get("/api/dts/v1/navigation?resource=st-augustin-confessions&down=1")
+    other = Cache().namespace('toc').get(('st-augustin-confessions', 'default'))
+    watcher = CorpusWatcher(store, report=lambda message: None)
+    assert watcher.scan() == []
+
+    source = tmp_path / 'database' / store.get_index_entry('short-document')[0].location
+    source.write_bytes(source.read_bytes().replace(b'<div n="Matthieu">', b'<div n="Marc">'))
+    changed = watcher.scan()
+    assert changed == [store.get_index_entry('short-document')[0].location]
+    watcher.refresh(changed[0])
+
+    # the new TOC is swapped in with the stamp of the new file, the other resources stay cached
+    toc = Cache().namespace('toc').get(('short-document', 'default'), version=store.get_stamp(store.get_index_entry('short-document')[0]))
+    assert toc.get('Marc') is not None and toc.get('Matthieu') is None
+    assert Cache().namespace('toc').get(('st-augustin-confessions', 'default')) is other
+
+    second = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert 'Marc' in second.text
@@ -0,0 +1,33 @@
+from copy import deepcopy
+
+from lxml import etree
+
+from dts_api.classes.Pipeline import TocPipelineBuilder
+from dts_api.classes.Store import Store
+from dts_api.classes.Utils import nsmp
+from dts_api.classes.XPathRegistry import XPathRegistry
+from .fixture import store_settings_fixture
+
+
+def test_citation_trees_are_compiled_once_per_encoding(store_settings, monkeypatch):
+    registry = XPathRegistry()
+    registry.clear()
+    compiled = []
+    compile_tree = registry.compile
+    monkeypatch.setattr(registry, 'compile', lambda tree: compiled.append(tree) or compile_tree(tree))
+
+    item = Store().get_index_entry('st-augustin-confessions')[0]
+    document, cite_metadata, cite_structure = Store().get_document(item)
+    builder = TocPipelineBuilder()
+    toc = builder.build_toc(document, cite_metadata, cite_structure, 'default', nsmp()[2])
+    # another document with the same refsDecl reuses the compiled expressions
+    builder.build_toc(deepcopy(document), cite_metadata, deepcopy(cite_structure), 'default', nsmp()[2])
+    assert len(compiled) == 1
+
+    # a different encoding is compiled on its own
+    changed = deepcopy(cite_structure)
+    changed[0].set('unit', 'chapter')
+    other = builder.build_toc(document, cite_metadata, changed, 'default', nsmp()[2])
+    assert len(compiled) == 2
+    assert {unit.get('unit') for unit in other.units} != {unit.get('unit') for unit in toc.units}
+    assert etree.tostring(builder.build_toc(document, cite_metadata, cite_structure, 'default', nsmp()[2]).toc) == etree.tostring(toc.toc)
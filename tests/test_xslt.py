@@ -0,0 +1,61 @@
+import os
+
+from lxml import etree
+
+from dts_api.classes.Cache import Cache
+from dts_api.classes.Designer import HtmlDesigner
+from dts_api.classes.DtsResource import DtsResource
+from dts_api.classes.Utils import nsmp
+from dts_api.classes.XsltRegistry import XsltRegistry
+
+STYLESHEET = '''<xsl:stylesheet xmlns:xsl="http://www.w3.org/1999/XSL/Transform" version="1.0">
+    <xsl:output method="html"/>
+    <xsl:template match="/"><p>%s</p></xsl:template>
+</xsl:stylesheet>'''
+
+
+def write_stylesheet(path, text: str, mtime_ns: int):
+    path.write_text(STYLESHEET % text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_registry_compiles_once_and_reloads_on_change(tmp_path):
+    path = tmp_path / 'test.xsl'
+    write_stylesheet(path, 'first', 1_000_000_000)
+    registry = XsltRegistry()
+    registry.register('test', str(path))
+
+    transform, version = registry.get('test')
+    assert registry.get('test') == (transform, version)
+
+    write_stylesheet(path, 'second', 2_000_000_000)
+    reloaded, new_version = registry.get('test')
+    assert reloaded is not transform and new_version != version
+    assert 'second' in str(reloaded(etree.ElementTree(etree.Element('TEI'))))
+
+def test_html_views_are_cached_per_stylesheet_version(tmp_path):
+    path = tmp_path / 'view.xsl'
+    write_stylesheet(path, 'first', 1_000_000_000)
+    XsltRegistry().register('view', str(path))
+    prefix, namespace, nsmap = nsmp()
+    document = etree.ElementTree(etree.Element(f'{namespace}TEI'))
+    resource = DtsResource('sample', document, None, None, namespace, (None, None, None, 'default'), 'view')
+    Cache().namespace('html').clear()
+
+    assert 'first' in HtmlDesigner.design_root(resource.root, resource, nsmap)
+    hits = Cache().namespace('html').stats()['hits']
+    assert 'first' in HtmlDesigner.design_root(resource.root, resource, nsmap)
+    assert Cache().namespace('html').stats()['hits'] == hits + 1
+
+    # other selections of the resource share its view
+    other = DtsResource('sample', document, None, None, namespace, ('1', None, None, 'default'), 'view')
+    assert 'first' in HtmlDesigner.design_root(other.root, other, nsmap)
+    assert len(Cache().namespace('html')) == 1
+
+    write_stylesheet(path, 'second', 2_000_000_000)
+    assert 'second' in HtmlDesigner.design_root(resource.root, resource, nsmap)
+
+    # a new version of the source file is transformed again
+    edited = DtsResource('sample', etree.ElementTree(etree.Element(f'{namespace}TEI')), None, None, namespace,
+                         (None, None, None, 'default'), 'view', version=(2, 1))
+    HtmlDesigner.design_root(edited.root, edited, nsmap)
+    assert Cache().namespace('html').get(('sample', 'view'), version=(XsltRegistry().get('view')[1], (2, 1))) is not None